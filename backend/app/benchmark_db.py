@@ -0,0 +1,86 @@
+# backend/app/benchmark_db.py
+# Requests/sec of a sync-Session route vs an AsyncSession route under high concurrency.
+# Each request holds a connection for DB_BENCH_SLEEP seconds (pg_sleep), like a slow Neon query.
+# Needs DATABASE_URL. Run from the repo root: python -m backend.app.benchmark_db
+import asyncio
+import os
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .database import get_db, get_async_db
+
+PORT = int(os.getenv("DB_BENCH_PORT", "8765"))
+SLEEP = float(os.getenv("DB_BENCH_SLEEP", "0.05"))
+CONCURRENCY = [int(c) for c in os.getenv("DB_BENCH_CONCURRENCY", "50,200").split(",")]
+REQUESTS = int(os.getenv("DB_BENCH_REQUESTS", "1000"))
+
+app = FastAPI()
+
+
+@app.get("/sync")
+def sync_route(db: Session = Depends(get_db)):
+    return {"ok": db.execute(text("SELECT pg_sleep(:s) IS NULL"), {"s": SLEEP}).scalar()}
+
+
+@app.get("/async")
+async def async_route(db: AsyncSession = Depends(get_async_db)):
+    return {"ok": (await db.execute(text("SELECT pg_sleep(:s) IS NULL"), {"s": SLEEP})).scalar()}
+
+
+def start_server():
+    server = uvicorn.Server(uvicorn.Config(app, port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def load(path, concurrency, total):
+    """Fire `total` requests with at most `concurrency` in flight; returns (req/s, p95 ms, errors)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=60) as client:
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+                except httpx.HTTPError:
+                    errors += 1
+
+        await client.get(path)  # warm the pool
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0
+    return len(latencies) / elapsed, p95, errors
+
+
+def main():
+    server = start_server()
+    try:
+        print(f"{REQUESTS} requests, pg_sleep({SLEEP}) per request")
+        for concurrency in CONCURRENCY:
+            for path in ("/sync", "/async"):
+                rps, p95, errors = asyncio.run(load(path, concurrency, REQUESTS))
+                print(f"  c={concurrency:4d} {path:7s}: {rps:8.1f} req/s  p95 {p95:8.1f} ms  errors {errors}")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
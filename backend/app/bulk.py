@@ -0,0 +1,55 @@
+# backend/app/bulk.py
+from sqlalchemy import update, values, column, cast
+import os
+
+BULK_WRITE_BATCH_SIZE = int(os.getenv("BULK_WRITE_BATCH_SIZE", "500"))
+
+
+class BulkUpdater:
+    """
+    Collects per-row column updates for one table (keyed by id) and writes them as
+    UPDATE ... FROM (VALUES ...) statements, `batch_size` rows per statement.
+    Updates to the same id are merged. Caller flushes what's left and commits.
+    """
+
+    def __init__(self, db, table, batch_size=BULK_WRITE_BATCH_SIZE):
+        self.db = db
+        self.table = getattr(table, "__table__", table)
+        self.batch_size = batch_size
+        self._pending = {}
+        self.rows_written = 0
+        self.statements = 0
+
+    def add(self, row_id, **fields):
+        self._pending.setdefault(row_id, {}).update(fields)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        pending, self._pending = self._pending, {}
+
+        # One statement per distinct column set, so no row overwrites a column it didn't set
+        groups = {}
+        for row_id, fields in pending.items():
+            names = tuple(sorted(fields))
+            groups.setdefault(names, []).append((row_id, *(fields[n] for n in names)))
+
+        for names, rows in groups.items():
+            self.db.execute(self.update_from_values(names, rows))
+            self.statements += 1
+            self.rows_written += len(rows)
+        return len(pending)
+
+    def update_from_values(self, names, rows):
+        table = self.table
+        data = values(
+            column("id", table.c.id.type),
+            *(column(n, table.c[n].type) for n in names),
+            name="v"
+        ).data(rows)
+        # Casts keep Postgres from typing an all-NULL VALUES column as text
+        return (
+            update(table)
+            .where(table.c.id == data.c.id)
+            .values({n: cast(data.c[n], table.c[n].type) for n in names})
+        )
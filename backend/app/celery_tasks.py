@@ -1,24 +1,78 @@
 # backend/celery_tasks.py
-from celery import Celery
-from ..scraper.amazon_scraper import scrape_amazon_reviews
-from ..nlp.fake_detector import predict_fake_ensemble
-from .database import SessionLocal
-from .models import ProductLink, Product
-from ..nlp.sentiment_analyzer import analyze_sentiment
+from celery import Celery, chord, group
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
+from ..scraper.amazon_scraper import scrape_amazon_reviews, scrape_amazon_reviews_incremental
+from ..scraper.browser_pool import close_browser_pools
+from ..scraper.async_engine import scrape_links
+from ..scraper.selector_registry import get_selector_registry, synced_selector_stats
+from .database import SessionLocal, configure_engine, reset_engine_after_fork
+from .models import ProductLink, Product, User, Review
+from .bulk import BulkUpdater
+from .history import record_snapshot
+from .reviews import (
+    upsert_reviews, touch_reviews, known_review_hashes, current_reviews_for_links, review_to_dict, ANALYSIS_FIELDS,
+)
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime
+from types import SimpleNamespace
 import logging
 import os 
 from dotenv import load_dotenv
 load_dotenv()
 # Celery config
-celery = Celery("reputrack", broker=os.getenv("REDIS_URL"))
+celery = Celery("reputrack", broker=os.getenv("REDIS_URL"), backend=os.getenv("REDIS_URL"))
+celery.conf.task_track_started = True
+
+# Pipeline stages: browser-bound scraping and CPU-bound inference run on separate queues,
+# so each worker pool scales on its own and only inference workers load the NLP models
+SCRAPE_QUEUE = os.getenv("SCRAPE_QUEUE", "scrape")
+INFERENCE_QUEUE = os.getenv("INFERENCE_QUEUE", "inference")
+celery.conf.task_routes = {
+    "*.scrape_single_product": {"queue": SCRAPE_QUEUE},
+    "*.scrape_link_batch": {"queue": SCRAPE_QUEUE},
+    "*.finalize_scheduled_scrape": {"queue": SCRAPE_QUEUE},
+    "*.scrape_and_analyze_all": {"queue": SCRAPE_QUEUE},
+    "*.analyze_link_batch": {"queue": INFERENCE_QUEUE},
+}
+# Inference tasks are long and CPU heavy - don't let one worker hoard a backlog of them
+celery.conf.worker_prefetch_multiplier = 1
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Scheduled scrape fan-out
+SCRAPE_BATCH_SIZE = int(os.getenv("SCRAPE_BATCH_SIZE", "5"))
+SCRAPE_RATE_LIMIT = os.getenv("SCRAPE_RATE_LIMIT", "12/m")  # batch tasks per worker
+SCRAPE_STAGGER_SECONDS = int(os.getenv("SCRAPE_STAGGER_SECONDS", "10"))
+# Links per inference task. The scheduled scrape queues each batch's links as soon as the
+# batch commits, so its inference tasks hold at most SCRAPE_BATCH_SIZE links.
+INFERENCE_BATCH_LINKS = int(os.getenv("INFERENCE_BATCH_LINKS", "20"))
+# Walk newest-first review pages only until already-stored reviews are reached
+SCRAPER_INCREMENTAL = os.getenv("SCRAPER_INCREMENTAL", "true").lower() != "false"
+
 # Initialize Resend
 resend= os.getenv("RESEND_API_KEY")
 
 
+@worker_init.connect
+def configure_worker_db(**kwargs):
+    """Worker processes use the small worker pool settings instead of the API's"""
+    configure_engine("worker")
+
+
+@worker_process_init.connect
+def reset_db_after_fork(**kwargs):
+    """Prefork children must not share the parent's pooled connections"""
+    configure_engine("worker")
+    reset_engine_after_fork()
+
+
+@worker_process_shutdown.connect
+def shutdown_browser_pool(**kwargs):
+    """Close the long-lived browsers of this prefork child (its tasks ran on this same thread)"""
+    close_browser_pools()
+
+
 def send_rating_drop_email(user_email, product_name, old_rating, new_rating, product_url):
     """Send email notification when rating drops"""
     try:
@@ -89,118 +143,304 @@ def send_rating_drop_email(user_email, product_name, old_rating, new_rating, pro
         return False
 
 
+def _scrape_targets(db, *criteria):
+    """
+    Link rows to scrape, with the product and owner fields the rating alerts need,
+    in one joined query instead of lazy-loading link.product.user per link
+    """
+    return db.execute(
+        select(
+            ProductLink.id, ProductLink.url, ProductLink.platform, ProductLink.last_rating,
+            Product.name.label("product_name"), User.email.label("user_email"),
+        )
+        .join(Product, ProductLink.product_id == Product.id)
+        .join(User, Product.user_id == User.id)
+        .where(*criteria)
+        .order_by(ProductLink.id)
+    ).all()
+
+
+def _store_raw_reviews(db, links_writer, link, result):
+    """
+    Scrape stage: upsert the raw reviews into the reviews table for the inference stage
+    and queue the link's rating/note update on links_writer.
+    Returns a summary dict, including the ratings needed for drop alerts.
+    """
+    summary = {"link_id": link.id, "status": "no_reviews", "old_rating": link.last_rating or 0, "new_rating": 0,
+               "tier": result.get("tier", "browser")}
+    # An incremental scrape that read pages but found nothing new is still a good scrape
+    incremental = bool(result.get("incremental") and result.get("pages"))
+
+    if result.get("reviews") or incremental:
+        new_rating = result.get("rating") or 0
+        seen_at = datetime.utcnow()
+        # Savepoint so one bad link doesn't abort the rest of the batch's transaction
+        with db.begin_nested():
+            if incremental:
+                touch_reviews(db, link.id, seen_at)
+            upsert_reviews(db, link.id, result["reviews"], seen_at=seen_at)
+        if incremental:
+            note = (f"Scraped {len(result['reviews'])} new reviews from {result['pages']} pages "
+                    f"({result.get('skipped', 0)} known skipped), awaiting analysis")
+        else:
+            note = f"Scraped {len(result['reviews'])} reviews, awaiting analysis"
+        links_writer.add(link.id, last_rating=new_rating, scrape_note=note)
+        summary.update(status="success", new_rating=new_rating, reviews=len(result["reviews"]), note=note)
+        logger.info(f"✓ {note} ({link.url})")
+    else:
+        links_writer.add(link.id, scrape_note=result.get("error") or result.get("note", "No reviews found"))
+        logger.warning(f"No reviews found for {link.url}")
+
+    return summary
+
+
+def _is_rating_drop(old_rating, new_rating):
+    return new_rating > 0 and old_rating > 0 and old_rating > new_rating + 0.5
+
+
+def dispatch_inference(link_ids):
+    """Queue inference for scraped links in INFERENCE_BATCH_LINKS-sized batches"""
+    for i in range(0, len(link_ids), INFERENCE_BATCH_LINKS):
+        analyze_link_batch.delay(link_ids[i:i + INFERENCE_BATCH_LINKS])
+
+
 @celery.task
 def scrape_single_product(product_id: int):
-    """Scrape a single product immediately after creation"""
+    """Scrape a single product immediately after creation, then hand off to inference"""
     db = SessionLocal()
     try:
-        product = db.query(Product).filter(Product.id == product_id).first()
-        if not product:
+        links = _scrape_targets(db, ProductLink.product_id == product_id)
+        if not links:
             logger.error(f"Product {product_id} not found")
             return {"error": "Product not found"}
 
-        logger.info(f"Starting scrape for product: {product.name}")
-        
-        for link in product.links:
-            if link.platform != "amazon":
-                continue
+        product_name = links[0].product_name
+        logger.info(f"Starting scrape for product: {product_name}")
+        links_writer = BulkUpdater(db, ProductLink)
+        known = known_review_hashes(db, [link.id for link in links]) if SCRAPER_INCREMENTAL else {}
+        scraped_ids = []
+
+        with synced_selector_stats():
+            for link in links:
+                if link.platform != "amazon":
+                    continue
                 
+                try:
+                    logger.info(f"Scraping: {link.url}")
+                    if SCRAPER_INCREMENTAL:
+                        result = scrape_amazon_reviews_incremental(link.url, known[link.id], headless=True)
+                    else:
+                        result = scrape_amazon_reviews(link.url, headless=True)
+                    if _store_raw_reviews(db, links_writer, link, result)["status"] == "success":
+                        scraped_ids.append(link.id)
+
+                except Exception as e:
+                    links_writer.add(link.id, scrape_note=f"Error: {str(e)}")
+                    logger.error(f"Error scraping {link.url}: {e}")
+
+        links_writer.flush()
+        db.commit()
+        dispatch_inference(scraped_ids)
+        logger.info(f"✓ Completed scraping for: {product_name}")
+        return {"status": "scraped", "product_id": product_id, "links": scraped_ids}
+
+    except Exception as e:
+        logger.error(f"Fatal error for product {product_id}: {e}")
+        db.rollback()
+        return {"error": str(e)}
+    finally:
+        db.close()
+
+
+@celery.task(bind=True, rate_limit=SCRAPE_RATE_LIMIT, acks_late=True)
+def scrape_link_batch(self, link_ids):
+    """
+    Scrape a small batch of links (one member of the scheduled chord) and queue inference
+    for its scraped links as soon as the batch commits. Never raises: a failed link or
+    batch comes back as "error" summaries, so the chord callback always runs.
+    """
+    db = SessionLocal()
+    summaries = []
+    try:
+        links = _scrape_targets(db, ProductLink.id.in_(link_ids))
+        links_writer = BulkUpdater(db, ProductLink)
+        self.update_state(state="PROGRESS", meta={"done": 0, "total": len(links)})
+
+        # Links in a batch are scraped concurrently by the async engine
+        jobs = [(link.id, link.url, link.platform) for link in links]
+        if SCRAPER_INCREMENTAL:
+            known = known_review_hashes(db, [link.id for link in links])
+            jobs = [job + ({"known_hashes": known[job[0]]},) if job[2] == "amazon" else job for job in jobs]
+        results = scrape_links(jobs, headless=True)
+
+        for done, link in enumerate(links, start=1):
             try:
-                logger.info(f"Scraping: {link.url}")
-                result = scrape_amazon_reviews(link.url, headless=True)
+                summary = _store_raw_reviews(db, links_writer, link, results.get(link.id, {"reviews": [], "note": "Not scraped"}))
 
-                if result.get("reviews"):
-                    # 1. Fake review detection
-                    analyzed_reviews, fake_ratio = predict_fake_ensemble(result["reviews"])
-                    
-                    # 2. Sentiment analysis
-                    analyzed_reviews, sentiment_score, sentiment_breakdown = analyze_sentiment(analyzed_reviews)
-                    
-                    link.last_rating = result.get("rating", 0)
-                    link.fake_ratio = fake_ratio
-                    link.sentiment_score = sentiment_score
-                    link.reviews_json = analyzed_reviews
-                    link.last_scraped = datetime.utcnow()
-                    link.scrape_note = f"Success: {len(analyzed_reviews)} reviews analyzed"
-                    
-                    logger.info(f"✓ Analyzed {len(analyzed_reviews)} reviews")
-                    logger.info(f"  - Fake ratio: {fake_ratio:.2%}")
-                    logger.info(f"  - Sentiment: {sentiment_score:.2f} (Pos: {sentiment_breakdown['positive']}, Neg: {sentiment_breakdown['negative']}, Neu: {sentiment_breakdown['neutral']})")
-                else:
-                    link.scrape_note = result.get("note", "No reviews found")
-                    logger.warning(f"No reviews found for {link.url}")
+                if _is_rating_drop(summary["old_rating"], summary["new_rating"]):
+                    links_writer.add(link.id, scrape_note=f"{summary['note']} | RATING DROPPED from {summary['old_rating']} to {summary['new_rating']}")
+                    logger.warning(f"⚠️  Rating drop detected: {summary['old_rating']} → {summary['new_rating']}")
+                    summary["alert"] = {
+                        "user_email": link.user_email,
+                        "product_name": link.product_name,
+                        "product_url": link.url,
+                    }
+
+                logger.info(f"✓ Done: {link.product_name}")
 
             except Exception as e:
-                link.scrape_note = f"Error: {str(e)}"
-                logger.error(f"Error scraping {link.url}: {e}")
+                links_writer.add(link.id, scrape_note=f"Error: {str(e)}")
+                summary = {"link_id": link.id, "status": "error", "error": str(e)}
+                logger.error(f"✗ Failed: {e}")
+
+            summaries.append(summary)
+            self.update_state(state="PROGRESS", meta={"done": done, "total": len(links)})
 
+        # All rating/note updates for the batch go out together, in one transaction
+        links_writer.flush()
         db.commit()
-        logger.info(f"✓ Completed scraping for: {product.name}")
-        return {"status": "completed", "product_id": product_id}
+        logger.info(f"Selector stats: {get_selector_registry().stats()}")
 
     except Exception as e:
-        logger.error(f"Fatal error for product {product_id}: {e}")
+        # Nothing from the batch was committed, so every link reports the failure
         db.rollback()
-        return {"error": str(e)}
+        logger.error(f"✗ Batch failed for links {link_ids}: {e}")
+        return [{"link_id": link_id, "status": "error", "error": str(e)} for link_id in link_ids]
     finally:
         db.close()
 
+    # Inference starts on this batch now instead of waiting for the slowest batch in the chord
+    scraped_ids = [s["link_id"] for s in summaries if s["status"] == "success"]
+    try:
+        dispatch_inference(scraped_ids)
+    except Exception as e:
+        # The reviews stay stored with is_fake unset; the link's next successful scrape queues them again
+        logger.error(f"✗ Could not queue inference for links {scraped_ids}: {e}")
+    return summaries
+
 
 @celery.task
-def scrape_and_analyze_all():
-    """Scheduled task to scrape all products"""
-    db = SessionLocal()
-    links = db.query(ProductLink).filter(ProductLink.platform == "amazon").all()
+def finalize_scheduled_scrape(batch_results):
+    """Chord callback: aggregate the batch summaries and send rating drop alerts (inference is queued per batch)"""
+    summaries = [s for batch in batch_results for s in (batch or [])]
+    totals = {"links": len(summaries), "success": 0, "no_reviews": 0, "error": 0, "alerts_sent": 0}
 
-    logger.info(f"Starting scheduled scrape for {len(links)} links")
+    for summary in summaries:
+        totals[summary["status"]] = totals.get(summary["status"], 0) + 1
+        if summary.get("tier"):
+            # Which fetch tier served the link: plain HTTP or the browser fallback
+            tier = f"tier_{summary['tier']}"
+            totals[tier] = totals.get(tier, 0) + 1
 
-    for link in links:
-        try:
-            logger.info(f"Scraping: {link.url}")
-            result = scrape_amazon_reviews(link.url, headless=True)
+        alert = summary.get("alert")
+        if alert and send_rating_drop_email(
+            user_email=alert["user_email"],
+            product_name=alert["product_name"],
+            old_rating=summary["old_rating"],
+            new_rating=summary["new_rating"],
+            product_url=alert["product_url"]
+        ):
+            totals["alerts_sent"] += 1
 
-            if result.get("reviews"):
-                # Fake detection
-                analyzed_reviews, fake_ratio = predict_fake_ensemble(result["reviews"])
-                
-                # Sentiment analysis
-                analyzed_reviews, sentiment_score, sentiment_breakdown = analyze_sentiment(analyzed_reviews)
-                
-                old_rating = link.last_rating or 0
-                new_rating = result["rating"] or 0
-
-                link.last_rating = new_rating
-                link.fake_ratio = fake_ratio
-                link.sentiment_score = sentiment_score
-                link.reviews_json = analyzed_reviews
-                link.last_scraped = datetime.utcnow()
-                link.scrape_note = f"Success: {len(analyzed_reviews)} reviews"
-
-                # Rating drop detection - Send email
-                if new_rating > 0 and old_rating > 0 and old_rating > new_rating + 0.5:
-                    link.scrape_note += f" | RATING DROPPED from {old_rating} to {new_rating}"
-                    logger.warning(f"⚠️  Rating drop detected: {old_rating} → {new_rating}")
-                    
-                    # Send email notification
-                    user_email = link.product.user.email
-                    send_rating_drop_email(
-                        user_email=user_email,
-                        product_name=link.product.name,
-                        old_rating=old_rating,
-                        new_rating=new_rating,
-                        product_url=link.url
-                    )
-
-            else:
-                link.scrape_note = result.get("note", "No reviews")
+    logger.info(f"✓ Scheduled scrape completed: {totals}")
+    return totals
 
-            db.commit()
-            logger.info(f"✓ Done: {link.product.name}")
 
+@celery.task(bind=True, acks_late=True)
+def analyze_link_batch(self, link_ids):
+    """Inference stage: run fake detection and sentiment on links with raw reviews"""
+    # Imported here so only inference workers import torch; the models themselves
+    # load on first use through the model registry, once per worker process
+    from ..nlp.inference_cache import analyze_reviews_cached, get_inference_cache
+    from ..nlp.batching import get_fake_batcher
+    from ..nlp.model_registry import models
+    from ..nlp.sentiment_analyzer import summarize_sentiment
+
+    db = SessionLocal()
+    try:
+        links = db.execute(
+            select(ProductLink.id, ProductLink.last_rating).where(ProductLink.id.in_(link_ids))
+        ).all()
+        current = current_reviews_for_links(db, [link.id for link in links])
+        links = [link for link in links if current[link.id]]
+        links_writer = BulkUpdater(db, ProductLink)
+        reviews_writer = BulkUpdater(db, Review)
+        self.update_state(state="PROGRESS", meta={"done": 0, "total": len(links)})
+
+        # Only rows without analysis go to the models; cache hits skip them too,
+        # and misses are batched across all links in this task
+        pending = {link.id: [r for r in current[link.id] if r.is_fake is None] for link in links}
+        try:
+            results = analyze_reviews_cached([[review_to_dict(r) for r in pending[link.id]] for link in links])
         except Exception as e:
-            link.scrape_note = f"Error: {str(e)}"
+            for link in links:
+                links_writer.add(link.id, scrape_note=f"Error: {str(e)}")
+            links_writer.flush()
             db.commit()
-            logger.error(f"✗ Failed: {e}")
+            logger.error(f"✗ Analysis failed for links {link_ids}: {e}")
+            return {"error": str(e)}
+
+        analyzed_at = datetime.utcnow()
+        for done, (link, (analyzed, _, _, _)) in enumerate(zip(links, results), start=1):
+            for row, review in zip(pending[link.id], analyzed):
+                fields = {field: review[field] for field in ANALYSIS_FIELDS}
+                reviews_writer.add(row.id, **fields)
+                # Keep the loaded rows in step for the link scores below (not flushed by the ORM)
+                for field, value in fields.items():
+                    set_committed_value(row, field, value)
+
+            # Link scores cover every review on the latest scrape, not just the newly analyzed ones
+            reviews = current[link.id]
+            fake_ratio = round(sum(r.is_fake for r in reviews) / len(reviews), 3)
+            sentiment_score, sentiment_breakdown = summarize_sentiment([review_to_dict(r) for r in reviews])
+
+            note = f"Success: {len(reviews)} reviews analyzed"
+            links_writer.add(link.id, fake_ratio=fake_ratio, sentiment_score=sentiment_score,
+                             last_scraped=analyzed_at, scrape_note=note)
+            scores = SimpleNamespace(id=link.id, last_rating=link.last_rating,
+                                     fake_ratio=fake_ratio, sentiment_score=sentiment_score)
+            record_snapshot(db, scores, review_count=len(reviews), captured_at=analyzed_at)
+
+            logger.info(f"✓ Analyzed {len(pending[link.id])} new of {len(reviews)} reviews for link {link.id}")
+            logger.info(f"  - Fake ratio: {fake_ratio:.2%}")
+            logger.info(f"  - Sentiment: {sentiment_score:.2f} (Pos: {sentiment_breakdown['positive']}, Neg: {sentiment_breakdown['negative']}, Neu: {sentiment_breakdown['neutral']})")
+            self.update_state(state="PROGRESS", meta={"done": done, "total": len(links)})
+
+        reviews_writer.flush()
+        links_writer.flush()
+        db.commit()
+
+        cache_stats = get_inference_cache().stats()
+        logger.info(f"Bulk writes: {reviews_writer.rows_written} reviews, {links_writer.rows_written} links "
+                    f"in {reviews_writer.statements + links_writer.statements} statements")
+        logger.info(f"Fake batcher stats: {get_fake_batcher().stats()}")
+        logger.info(f"Inference cache stats: {cache_stats}")
+        logger.info(f"Model registry: {models.stats()}")
+        return {"analyzed": len(links), "cache": cache_stats}
+    finally:
+        db.close()
+
+
+@celery.task
+def scrape_and_analyze_all():
+    """Scheduled task: fan out one scrape task per batch of links, aggregated by a chord callback"""
+    db = SessionLocal()
+    try:
+        link_ids = [row.id for row in db.query(ProductLink.id).filter(ProductLink.platform == "amazon").all()]
+    finally:
+        db.close()
+
+    batches = [link_ids[i:i + SCRAPE_BATCH_SIZE] for i in range(0, len(link_ids), SCRAPE_BATCH_SIZE)]
+    logger.info(f"Starting scheduled scrape for {len(link_ids)} links in {len(batches)} batches")
+    if not batches:
+        return {"links": 0, "batches": 0}
+
+    # Stagger batch start times on top of the per-worker rate limit
+    header = group(
+        scrape_link_batch.s(batch).set(countdown=i * SCRAPE_STAGGER_SECONDS)
+        for i, batch in enumerate(batches)
+    )
+    result = chord(header)(finalize_scheduled_scrape.s())
 
-    db.close()
-    logger.info("✓ Scheduled scrape completed")
\ No newline at end of file
+    # Progress: AsyncResult(chord_id).parent holds the group, whose children report PROGRESS meta
+    return {"links": len(link_ids), "batches": len(batches), "chord_id": result.id}
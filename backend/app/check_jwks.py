@@ -0,0 +1,123 @@
+# backend/app/check_jwks.py
+# Exercises JWKSManager and VerifiedTokenCache against a stub JWKS fetcher and locally
+# generated RSA keys: TTL refresh, refetch on an unknown kid (rotation), rejection of a
+# token signed with the wrong key, and token cache expiry at exp. No network or Clerk needed.
+# Run from the repo root: python -m backend.app.check_jwks
+import time
+import sys
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt, JWTError
+
+from .jwks import JWKSManager, VerifiedTokenCache
+
+ISSUER = "https://clerk.example.test"
+
+
+class StubFetcher:
+    """Serves whatever keys are currently published and counts the fetches"""
+
+    def __init__(self, *keys):
+        self.keys = list(keys)
+        self.fetches = 0
+
+    def __call__(self):
+        self.fetches += 1
+        return {"keys": [key.public_jwk for key in self.keys]}
+
+
+class SigningKey:
+    def __init__(self, kid):
+        self.kid = kid
+        private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.private_pem = private.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ).decode()
+        public_pem = private.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+        self.public_jwk = {**jwk.construct(public_pem, "RS256").to_dict(), "kid": kid, "use": "sig"}
+
+    def token(self, kid=None, expires_in=60):
+        claims = {"sub": "user_123", "iss": ISSUER, "exp": int(time.time()) + expires_in}
+        return jwt.encode(claims, self.private_pem, algorithm="RS256", headers={"kid": kid or self.kid})
+
+
+def verify(manager, cache, token):
+    """Same steps as dependencies.verify_token, on the given manager and cache"""
+    payload = cache.get(token)
+    if payload is not None:
+        return payload
+    key = manager.get_key(jwt.get_unverified_header(token).get("kid"))
+    if key is None:
+        raise JWTError("key not found")
+    payload = jwt.decode(token, key, algorithms=["RS256"], issuer=ISSUER, options={"verify_aud": False})
+    cache.put(token, payload)
+    return payload
+
+
+def rejected(manager, cache, token):
+    try:
+        verify(manager, cache, token)
+    except JWTError:
+        return True
+    return False
+
+
+def main():
+    failures = []
+
+    def check(label, ok, detail=""):
+        print(f"  {'PASS' if ok else 'FAIL'}  {label} {detail}")
+        if not ok:
+            failures.append(label)
+
+    old, new, attacker = SigningKey("key-old"), SigningKey("key-new"), SigningKey("key-attacker")
+
+    print("TTL refresh:")
+    fetcher = StubFetcher(old)
+    manager = JWKSManager(ttl=0.5, min_refresh=0, fetcher=fetcher)
+    check("first lookup fetches", manager.get_key("key-old") is not None and fetcher.fetches == 1)
+    manager.get_key("key-old")
+    check("known kid within the TTL is served from memory", fetcher.fetches == 1)
+    time.sleep(0.6)
+    manager.get_key("key-old")
+    check("lookup after the TTL refetches", fetcher.fetches == 2, f"({fetcher.fetches} fetches)")
+
+    print("Key rotation:")
+    fetcher = StubFetcher(old)
+    manager = JWKSManager(ttl=3600, min_refresh=0.5, fetcher=fetcher)
+    cache = VerifiedTokenCache()
+    verify(manager, cache, old.token())
+    time.sleep(0.6)
+    fetcher.keys.append(new)
+    check("token with an unknown kid triggers one refetch and verifies",
+          verify(manager, cache, new.token())["sub"] == "user_123" and fetcher.fetches == 2)
+    manager.get_key("key-missing")
+    manager.get_key("key-missing")
+    check("repeated unknown kids within min_refresh don't refetch", fetcher.fetches == 2,
+          f"({fetcher.fetches} fetches)")
+
+    print("Wrong key:")
+    check("token signed with another key under a published kid is rejected",
+          rejected(manager, cache, attacker.token(kid="key-old")))
+    check("token with a kid the issuer never publishes is rejected", rejected(manager, cache, attacker.token()))
+    check("rejected tokens are not cached", cache.get(attacker.token(kid="key-old")) is None)
+
+    print("Token cache:")
+    cache = VerifiedTokenCache()
+    token = old.token(expires_in=1)
+    payload = verify(manager, cache, token)
+    check("verified token is cached", cache.get(token) == payload)
+    time.sleep(max(0.0, payload["exp"] - time.time()) + 0.1)
+    check("cached token expires at exp", cache.get(token) is None)
+    cache.put("no-exp", {"sub": "user_123"})
+    check("payload without exp is never cached", cache.get("no-exp") is None)
+
+    print(f"\n{len(failures)} failed" if failures else "\nAll JWKS checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,13 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from dotenv import load_dotenv,find_dotenv
+import threading
+import time
 import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # backend/app
@@ -12,17 +18,214 @@ load_dotenv(dotenv_path=ENV_PATH)
 DATABASE_URL = os.getenv("DATABASE_URL")
 print("DATABASE_URL =", DATABASE_URL)
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"sslmode": "require"}  # Required for Neon
-)
+# Pool settings per process role. The API serves many short concurrent requests;
+# Celery workers run one task at a time per process, so they need few connections.
+# Recycle stays under Neon's idle suspend so we don't hand out dead connections.
+POOL_DEFAULTS = {
+    "api": {"pool_size": 10, "max_overflow": 10, "pool_timeout": 10, "pool_recycle": 240},
+    "worker": {"pool_size": 2, "max_overflow": 2, "pool_timeout": 30, "pool_recycle": 240},
+}
+
+
+def pool_settings(role):
+    """Role defaults, overridable with DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE"""
+    settings = dict(POOL_DEFAULTS[role])
+    for key, env in (("pool_size", "DB_POOL_SIZE"), ("max_overflow", "DB_MAX_OVERFLOW"),
+                     ("pool_timeout", "DB_POOL_TIMEOUT"), ("pool_recycle", "DB_POOL_RECYCLE")):
+        if os.getenv(env):
+            settings[key] = int(os.getenv(env))
+    settings["pool_pre_ping"] = os.getenv("DB_POOL_PRE_PING", "true").lower() != "false"
+    return settings
+
+
+# Roles whose processes also open the async engine. Its connections come out of the role's
+# budget instead of adding to it, so one API process never holds more than
+# pool_size + max_overflow connections across both engines.
+ASYNC_ROLES = ("api",)
+DB_ASYNC_POOL_SHARE = float(os.getenv("DB_ASYNC_POOL_SHARE", "0.5"))
+
+
+def engine_pool_settings(role, kind="sync"):
+    """pool_settings(role), with pool_size/max_overflow split between the sync and async engines"""
+    settings = pool_settings(role)
+    if role not in ASYNC_ROLES:
+        return settings
+    for key, minimum in (("pool_size", 1), ("max_overflow", 0)):
+        total = settings[key]
+        async_part = min(max(minimum, round(total * DB_ASYNC_POOL_SHARE)), max(minimum, total - 1))
+        settings[key] = async_part if kind == "async" else max(minimum, total - async_part)
+    return settings
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long checkouts wait for a free connection, and separately
+    how long opening new connections (TCP + TLS handshake to Neon) takes
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = {"checkouts": 0, "waits": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0, "timeouts": 0,
+                           "connects": 0, "connect_ms_total": 0.0, "connect_ms_max": 0.0}
+        self._stats_lock = threading.Lock()
+        self._checkout = threading.local()
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            connect_ms = (time.perf_counter() - start) * 1000
+            # Taken back out of the checkout's wait in _do_get
+            self._checkout.connect_ms = getattr(self._checkout, "connect_ms", 0.0) + connect_ms
+            with self._stats_lock:
+                self.wait_stats["connects"] += 1
+                self.wait_stats["connect_ms_total"] += connect_ms
+                self.wait_stats["connect_ms_max"] = max(self.wait_stats["connect_ms_max"], connect_ms)
+
+    def _do_get(self):
+        # QueuePool._do_get retries by calling itself; only the outermost call is one checkout
+        depth = getattr(self._checkout, "depth", 0)
+        if depth:
+            return super()._do_get()
+
+        self._checkout.depth, self._checkout.connect_ms = 1, 0.0
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.wait_stats["timeouts"] += 1
+            raise
+        finally:
+            waited = (time.perf_counter() - start) * 1000 - self._checkout.connect_ms
+            self._checkout.depth = 0
+            with self._stats_lock:
+                self.wait_stats["checkouts"] += 1
+                self.wait_stats["wait_ms_total"] += waited
+                self.wait_stats["wait_ms_max"] = max(self.wait_stats["wait_ms_max"], waited)
+                if waited >= 1.0:
+                    self.wait_stats["waits"] += 1
+
+    def recreate(self):
+        # dispose() swaps in a recreated pool; keep the counters (and the lock guarding them) across it
+        new_pool = super().recreate()
+        new_pool.wait_stats = self.wait_stats
+        new_pool._stats_lock = self._stats_lock
+        return new_pool
+
+
+def make_engine(role):
+    return create_engine(
+        DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        connect_args={
+            "sslmode": "require",  # Required for Neon
+            "application_name": f"reputrack-{role}",
+            "keepalives": 1,
+            "keepalives_idle": 30,
+        },
+        **engine_pool_settings(role)
+    )
+
+
+DB_ROLE = os.getenv("DB_ROLE", "api")
+engine = make_engine(DB_ROLE)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+
+def configure_engine(role):
+    """Rebuild the engine for a process role (Celery workers call this at startup)"""
+    global engine, DB_ROLE
+    if role == DB_ROLE:
+        return engine
+    old_engine = engine
+    engine = make_engine(role)
+    DB_ROLE = role
+    SessionLocal.configure(bind=engine)
+    old_engine.dispose()
+    return engine
+
+
+def reset_engine_after_fork():
+    """
+    Forked Celery children inherit the parent's pooled sockets; drop them without
+    closing (the parent still owns them) so each child opens its own connections.
+    """
+    engine.dispose(close=False)
+
+
+def pool_metrics():
+    pool = engine.pool
+    wait = dict(pool.wait_stats)
+    wait["wait_ms_avg"] = round(wait["wait_ms_total"] / wait["checkouts"], 2) if wait["checkouts"] else 0.0
+    wait["wait_ms_total"] = round(wait["wait_ms_total"], 2)
+    wait["wait_ms_max"] = round(wait["wait_ms_max"], 2)
+    wait["connect_ms_avg"] = round(wait["connect_ms_total"] / wait["connects"], 2) if wait["connects"] else 0.0
+    wait["connect_ms_total"] = round(wait["connect_ms_total"], 2)
+    wait["connect_ms_max"] = round(wait["connect_ms_max"], 2)
+    metrics = {
+        "role": DB_ROLE,
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": engine_pool_settings(DB_ROLE)["max_overflow"],
+        **wait,
+    }
+    if _async_engine is not None:
+        async_pool = _async_engine.pool
+        metrics["async"] = {
+            "pool_size": async_pool.size(),
+            "checked_out": async_pool.checkedout(),
+            "checked_in": async_pool.checkedin(),
+            "overflow": async_pool.overflow(),
+        }
+    return metrics
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Async engine for the FastAPI routes (asyncpg). Celery keeps the sync engine above.
+_async_engine = None
+_async_sessionmaker = None
+
+
+def async_database_url(url=DATABASE_URL):
+    """Same database on the asyncpg driver; libpq-only query params are dropped (SSL goes in connect_args)"""
+    return (
+        make_url(url)
+        .set(drivername="postgresql+asyncpg")
+        .difference_update_query(["sslmode", "channel_binding"])
+    )
+
+
+def get_async_engine():
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        settings = engine_pool_settings(DB_ROLE, "async")
+        _async_engine = create_async_engine(
+            async_database_url(),
+            connect_args={"ssl": "require", "server_settings": {"application_name": f"reputrack-{DB_ROLE}-async"}},
+            **settings
+        )
+        _async_sessionmaker = async_sessionmaker(_async_engine, class_=AsyncSession, expire_on_commit=False)
+    return _async_engine
+
+
+def AsyncSessionLocal():
+    get_async_engine()
+    return _async_sessionmaker()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
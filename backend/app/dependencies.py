@@ -1,82 +1,136 @@
 # backend/app/dependencies.py
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.concurrency import run_in_threadpool
 from jose import jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from .database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import get_db, get_async_db
 import backend.app.models as models
+from .jwks import JWKSManager, VerifiedTokenCache
+from .user_cache import UserCache, CurrentUser
 import os
-import requests
 
 bearer_scheme = HTTPBearer()
 
-# Cache for JWKS
-_jwks_cache = None
+# Clerk signing keys (TTL + rotation refresh) and recently verified tokens
+jwks_manager = JWKSManager(f"{os.getenv('CLERK_ISSUER')}/.well-known/jwks.json")
+verified_tokens = VerifiedTokenCache()
+user_cache = UserCache()
 
-def get_jwks():
-    global _jwks_cache
-    if _jwks_cache is None:
-        jwks_url = f"{os.getenv('CLERK_ISSUER')}/.well-known/jwks.json"
-        response = requests.get(jwks_url)
-        _jwks_cache = response.json()
-    return _jwks_cache
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: Session = Depends(get_db)
-):
-    token = credentials.credentials
+def verify_token(token):
+    """Verify a Clerk session token and return its payload, skipping the RSA check for recently verified tokens"""
+    payload = verified_tokens.get(token)
+    if payload is not None:
+        return payload
+
+    # Decode the token header to get the key ID
+    unverified_header = jwt.get_unverified_header(token)
+    rsa_key = jwks_manager.get_key(unverified_header.get("kid"))
+    
+    if rsa_key is None:
+        raise HTTPException(status_code=401, detail="Invalid token - key not found")
+    
+    # Verify and decode the token with RS256
+    payload = jwt.decode(
+        token,
+        rsa_key,
+        algorithms=["RS256"],
+        issuer=os.getenv("CLERK_ISSUER"),
+        options={"verify_aud": False}
+    )
+    verified_tokens.put(token, payload)
+    return payload
+
+
+def clerk_id_from_payload(payload):
+    clerk_id: str = payload.get("sub")
+    if clerk_id is None:
+        raise HTTPException(status_code=401, detail="Invalid token - no subject")
+    return clerk_id
+
+
+def authenticate(token):
+    """verify_token with every failure mapped to a 401"""
     try:
-        # Get the JWKS (public keys)
-        jwks = get_jwks()
-        
-        # Decode the token header to get the key ID
-        unverified_header = jwt.get_unverified_header(token)
-        kid = unverified_header.get("kid")
-        
-        # Find the right key
-        rsa_key = None
-        for key in jwks["keys"]:
-            if key["kid"] == kid:
-                rsa_key = {
-                    "kty": key["kty"],
-                    "kid": key["kid"],
-                    "use": key["use"],
-                    "n": key["n"],
-                    "e": key["e"]
-                }
-                break
-        
-        if rsa_key is None:
-            raise HTTPException(status_code=401, detail="Invalid token - key not found")
-        
-        # Verify and decode the token with RS256
-        payload = jwt.decode(
-            token,
-            rsa_key,
-            algorithms=["RS256"],
-            issuer=os.getenv("CLERK_ISSUER"),
-            options={"verify_aud": False}
-        )
-        
-        clerk_id: str = payload.get("sub")
-        if clerk_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token - no subject")
-            
+        return verify_token(token)
+    except HTTPException:
+        raise
     except JWTError as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Token verification failed: {str(e)}")
 
-    user = db.query(models.User).filter(models.User.clerk_id == clerk_id).first()
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: Session = Depends(get_db)
+):
+    payload = authenticate(credentials.credentials)
+    clerk_id = clerk_id_from_payload(payload)
+
+    user = user_cache.get(clerk_id)
     if user is None:
-        # Auto-create user on first login
-        user = models.User(
-            clerk_id=clerk_id, 
-            email=payload.get("email", "unknown"), 
-            name=payload.get("name", "User")
-        )
-        db.add(user)
+        user = load_or_create_user(db, clerk_id, payload)
+        user_cache.put(user)
+    return user
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db)
+):
+    token = credentials.credentials
+    payload = verified_tokens.get(token)
+    if payload is None:
+        # RSA verify and a possible JWKS fetch are blocking - keep them off the event loop
+        payload = await run_in_threadpool(authenticate, token)
+    clerk_id = clerk_id_from_payload(payload)
+
+    user = user_cache.get(clerk_id)
+    if user is None:
+        user = await load_or_create_user_async(db, clerk_id, payload)
+        user_cache.put(user)
+    return user
+
+
+_USER_COLUMNS = (models.User.id, models.User.clerk_id, models.User.email)
+
+
+def _select_user(clerk_id):
+    return select(*_USER_COLUMNS).where(models.User.clerk_id == clerk_id)
+
+
+def _insert_user(clerk_id, payload):
+    # Concurrent first requests race on the unique clerk_id; the loser inserts nothing
+    return (
+        insert(models.User)
+        .values(clerk_id=clerk_id, email=payload.get("email", "unknown"), name=payload.get("name", "User"))
+        .on_conflict_do_nothing(index_elements=["clerk_id"])
+        .returning(*_USER_COLUMNS)
+    )
+
+
+def load_or_create_user(db, clerk_id, payload):
+    """Fetch the user row, auto-creating it on first login with an atomic upsert"""
+    row = db.execute(_select_user(clerk_id)).first()
+    if row is None:
+        row = db.execute(_insert_user(clerk_id, payload)).first()
         db.commit()
-        db.refresh(user)
-    return user
\ No newline at end of file
+        if row is None:
+            row = db.execute(_select_user(clerk_id)).first()
+    return CurrentUser(id=row.id, clerk_id=row.clerk_id, email=row.email)
+
+
+async def load_or_create_user_async(db, clerk_id, payload):
+    """Async twin of load_or_create_user"""
+    row = (await db.execute(_select_user(clerk_id))).first()
+    if row is None:
+        row = (await db.execute(_insert_user(clerk_id, payload))).first()
+        await db.commit()
+        if row is None:
+            row = (await db.execute(_select_user(clerk_id))).first()
+    return CurrentUser(id=row.id, clerk_id=row.clerk_id, email=row.email)
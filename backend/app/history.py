@@ -0,0 +1,95 @@
+# backend/app/history.py
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime, timedelta
+from .models import LinkSnapshot, LinkRollup
+
+ROLLUP_PERIODS = ("day", "week")
+
+
+def period_start(period, when):
+    day = when.date()
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def _sum_count(value):
+    return (value or 0.0, 0 if value is None else 1)
+
+
+def record_snapshot(db, link, review_count, captured_at=None):
+    """
+    Append a snapshot of the link's current scores and fold it into the daily/weekly rollups.
+    Caller commits.
+    """
+    captured_at = captured_at or datetime.utcnow()
+    rating = link.last_rating or None  # 0 means the rating wasn't found
+    db.add(LinkSnapshot(
+        link_id=link.id,
+        captured_at=captured_at,
+        rating=rating,
+        fake_ratio=link.fake_ratio,
+        sentiment_score=link.sentiment_score,
+        review_count=review_count,
+    ))
+
+    rating_sum, rating_count = _sum_count(rating)
+    fake_sum, fake_count = _sum_count(link.fake_ratio)
+    sentiment_sum, sentiment_count = _sum_count(link.sentiment_score)
+
+    for period in ROLLUP_PERIODS:
+        stmt = insert(LinkRollup).values(
+            link_id=link.id, period=period, period_start=period_start(period, captured_at), samples=1,
+            rating_min=rating, rating_max=rating, rating_sum=rating_sum, rating_count=rating_count,
+            fake_ratio_sum=fake_sum, fake_ratio_count=fake_count,
+            sentiment_sum=sentiment_sum, sentiment_count=sentiment_count,
+        )
+        # LEAST/GREATEST skip NULLs, so a snapshot without a rating leaves min/max alone
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_link_rollups_period",
+            set_={
+                "samples": LinkRollup.samples + 1,
+                "rating_min": func.least(LinkRollup.rating_min, stmt.excluded.rating_min),
+                "rating_max": func.greatest(LinkRollup.rating_max, stmt.excluded.rating_max),
+                "rating_sum": LinkRollup.rating_sum + stmt.excluded.rating_sum,
+                "rating_count": LinkRollup.rating_count + stmt.excluded.rating_count,
+                "fake_ratio_sum": LinkRollup.fake_ratio_sum + stmt.excluded.fake_ratio_sum,
+                "fake_ratio_count": LinkRollup.fake_ratio_count + stmt.excluded.fake_ratio_count,
+                "sentiment_sum": LinkRollup.sentiment_sum + stmt.excluded.sentiment_sum,
+                "sentiment_count": LinkRollup.sentiment_count + stmt.excluded.sentiment_count,
+            },
+        )
+        db.execute(stmt)
+
+
+def _avg(total, count):
+    return round(total / count, 3) if count else None
+
+
+def rollup_history(db, link_ids, period="day", days=180):
+    """Trend points per link from the precomputed rollups, oldest first"""
+    since = period_start(period, datetime.utcnow() - timedelta(days=days))
+    rows = (
+        db.query(LinkRollup)
+        .filter(
+            LinkRollup.link_id.in_(link_ids),
+            LinkRollup.period == period,
+            LinkRollup.period_start >= since
+        )
+        .order_by(LinkRollup.link_id, LinkRollup.period_start)
+        .all()
+    )
+    return [
+        {
+            "link_id": r.link_id,
+            "period_start": r.period_start,
+            "samples": r.samples,
+            "rating_min": r.rating_min,
+            "rating_max": r.rating_max,
+            "rating_avg": _avg(r.rating_sum, r.rating_count),
+            "fake_ratio_avg": _avg(r.fake_ratio_sum, r.fake_ratio_count),
+            "sentiment_avg": _avg(r.sentiment_sum, r.sentiment_count),
+        }
+        for r in rows
+    ]
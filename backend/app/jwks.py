@@ -0,0 +1,102 @@
+# backend/app/jwks.py
+from jose import jwk
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+import os
+import requests
+
+JWKS_TTL = int(os.getenv("JWKS_TTL", "3600"))                 # seconds between scheduled refreshes
+JWKS_MIN_REFRESH = int(os.getenv("JWKS_MIN_REFRESH", "30"))   # floor between unknown-kid refetches
+JWKS_TIMEOUT = float(os.getenv("JWKS_TIMEOUT", "5"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+
+
+class JWKSManager:
+    """
+    Clerk signing keys, refreshed every `ttl` seconds and re-fetched once when a
+    token names a kid we haven't seen (key rotation). Keys are pre-built into
+    jose key objects so verification doesn't re-parse the JWK every request.
+    `fetcher` returns a JWKS dict; pass a stub to test without the network.
+    """
+
+    def __init__(self, jwks_url=None, ttl=JWKS_TTL, min_refresh=JWKS_MIN_REFRESH, fetcher=None):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.min_refresh = min_refresh
+        self._fetcher = fetcher or self._fetch
+        self._keys = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def _fetch(self):
+        response = requests.get(self.jwks_url, timeout=JWKS_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    def _refresh(self):
+        jwks = self._fetcher()
+        keys = {}
+        for key in jwks.get("keys", []):
+            if key.get("kty") != "RSA" or not key.get("kid"):
+                continue
+            keys[key["kid"]] = jwk.construct(key, algorithm=key.get("alg", "RS256"))
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def get_key(self, kid):
+        """Key object for kid, or None if the issuer doesn't publish it"""
+        with self._lock:
+            age = time.monotonic() - self._fetched_at
+            try:
+                if not self._fetched_at or age > self.ttl:
+                    self._refresh()
+                elif kid not in self._keys and age > self.min_refresh:
+                    # Possibly rotated - fetch once, rate limited so bad kids can't hammer the issuer
+                    self._refresh()
+            except Exception:
+                # Keep serving the keys we have if the issuer is briefly unreachable
+                if not self._keys:
+                    raise
+            return self._keys.get(kid)
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of verified token payloads, keyed by token hash and expiring at the token's exp"""
+
+    def __init__(self, max_size=TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token):
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            payload, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, token, payload):
+        exp = payload.get("exp")
+        if exp is None:
+            return  # never cache tokens without an expiry
+        with self._lock:
+            self._entries[self._key(token)] = (payload, float(exp))
+            self._entries.move_to_end(self._key(token))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -3,7 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from .database import engine, Base, get_db
+from .database import engine, Base, get_db, pool_metrics
 from .routers import products
 
 # Create all tables
@@ -28,4 +28,9 @@ def read_root():
 @app.get("/api/health")
 def health_check(db: Session = Depends(get_db)):
     db.execute(text("SELECT 1"))
-    return {"status": "healthy", "db": "connected"}
\ No newline at end of file
+    return {"status": "healthy", "db": "connected"}
+
+@app.get("/api/health/db")
+def db_pool_health():
+    """Connection pool metrics: checked-out connections, overflow in use and checkout wait times"""
+    return pool_metrics()
\ No newline at end of file
@@ -0,0 +1,59 @@
+# backend/app/migrate.py
+# Idempotent schema migrations. Run from the repo root: python -m backend.app.migrate
+from sqlalchemy import text
+from .database import engine, SessionLocal, Base
+from . import models
+from .reviews import upsert_reviews
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columns added after product_links was first created (create_all never alters existing tables)
+ALTER_STATEMENTS = [
+    "ALTER TABLE product_links ADD COLUMN IF NOT EXISTS scrape_note VARCHAR",
+    "ALTER TABLE product_links ADD COLUMN IF NOT EXISTS reviews_json JSONB",
+]
+
+
+def migrate_schema():
+    # Creates missing tables and their indexes (everything, on a fresh database)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for stmt in ALTER_STATEMENTS:
+            conn.execute(text(stmt))
+
+
+def backfill_reviews(batch_size=200):
+    """Copy every link's reviews_json blob into the reviews table, keeping its analysis"""
+    db = SessionLocal()
+    try:
+        last_id, links_done, reviews_done = 0, 0, 0
+        while True:
+            links = (
+                db.query(models.ProductLink)
+                .filter(models.ProductLink.id > last_id, models.ProductLink.reviews_json.isnot(None))
+                .order_by(models.ProductLink.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not links:
+                break
+
+            for link in links:
+                reviews = [r for r in (link.reviews_json or []) if r.get("text")]
+                reviews_done += upsert_reviews(db, link.id, reviews, seen_at=link.last_scraped)
+                links_done += 1
+            db.commit()
+            last_id = links[-1].id
+            logger.info(f"Backfilled {links_done} links ({reviews_done} reviews)")
+
+        return links_done, reviews_done
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate_schema()
+    links_done, reviews_done = backfill_reviews()
+    logger.info(f"✓ Migration complete: {reviews_done} reviews from {links_done} links")
@@ -1,5 +1,5 @@
 # backend/app/models.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Boolean
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Float, Boolean, JSON, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy import text
 from datetime import datetime
@@ -40,5 +40,78 @@ class ProductLink(Base):
     last_scraped = Column(DateTime(timezone=True), nullable=True)
     fake_ratio = Column(Float, default=0.0)
     sentiment_score = Column(Float, nullable=True)
+    scrape_note = Column(String, nullable=True)
+    reviews_json = Column(JSON, nullable=True)  # legacy blob, superseded by the reviews table (kept for backfill)
 
-    product = relationship("Product", back_populates="links")
\ No newline at end of file
+    product = relationship("Product", back_populates="links")
+    reviews = relationship("Review", back_populates="link", cascade="all, delete-orphan", passive_deletes=True)
+    snapshots = relationship("LinkSnapshot", cascade="all, delete-orphan", passive_deletes=True)
+    rollups = relationship("LinkRollup", cascade="all, delete-orphan", passive_deletes=True)
+
+
+# Review has a "text" column, which would shadow sqlalchemy.text inside its class body
+_UTC_NOW = text("TIMEZONE('utc', now())")
+
+
+class Review(Base):
+    __tablename__ = "reviews"
+
+    id = Column(Integer, primary_key=True)
+    link_id = Column(Integer, ForeignKey("product_links.id", ondelete="CASCADE"), nullable=False)
+    content_hash = Column(String(64), nullable=False)  # sha256 of normalized text, see nlp.inference_cache.review_hash
+    text = Column(Text, nullable=False)
+    stars = Column(Integer, nullable=True)
+    is_fake = Column(Boolean, nullable=True)           # NULL until the inference stage has run
+    fake_probability = Column(Float, nullable=True)
+    sentiment = Column(String, nullable=True)
+    sentiment_score = Column(Float, nullable=True)
+    first_seen = Column(DateTime(timezone=True), server_default=_UTC_NOW, nullable=False)
+    last_seen = Column(DateTime(timezone=True), server_default=_UTC_NOW, nullable=False)
+
+    link = relationship("ProductLink", back_populates="reviews")
+
+    __table_args__ = (
+        UniqueConstraint("link_id", "content_hash", name="uq_reviews_link_hash"),
+        Index("ix_reviews_link_last_seen", "link_id", "last_seen"),
+        Index("ix_reviews_last_seen", "last_seen"),
+    )
+
+
+class LinkSnapshot(Base):
+    """Append-only record of a link's scores, written on every analyzed scrape"""
+    __tablename__ = "link_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    link_id = Column(Integer, ForeignKey("product_links.id", ondelete="CASCADE"), nullable=False)
+    captured_at = Column(DateTime(timezone=True), nullable=False)
+    rating = Column(Float, nullable=True)
+    fake_ratio = Column(Float, nullable=True)
+    sentiment_score = Column(Float, nullable=True)
+    review_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_link_snapshots_link_captured", "link_id", "captured_at"),
+    )
+
+
+class LinkRollup(Base):
+    """Daily/weekly aggregates of link snapshots, kept as sums so they update incrementally"""
+    __tablename__ = "link_rollups"
+
+    id = Column(Integer, primary_key=True)
+    link_id = Column(Integer, ForeignKey("product_links.id", ondelete="CASCADE"), nullable=False)
+    period = Column(String(8), nullable=False)        # day, week
+    period_start = Column(Date, nullable=False)       # weeks start on Monday
+    samples = Column(Integer, nullable=False, default=0)
+    rating_min = Column(Float, nullable=True)
+    rating_max = Column(Float, nullable=True)
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    rating_count = Column(Integer, nullable=False, default=0)
+    fake_ratio_sum = Column(Float, nullable=False, default=0.0)
+    fake_ratio_count = Column(Integer, nullable=False, default=0)
+    sentiment_sum = Column(Float, nullable=False, default=0.0)
+    sentiment_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("link_id", "period", "period_start", name="uq_link_rollups_period"),
+    )
\ No newline at end of file
@@ -0,0 +1,94 @@
+# backend/app/reviews.py
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime
+from .models import Review
+from ..nlp.inference_cache import review_hash
+
+ANALYSIS_FIELDS = ("is_fake", "fake_probability", "sentiment", "sentiment_score")
+
+
+def upsert_reviews(db, link_id, reviews, seen_at=None):
+    """
+    Insert scraped reviews for a link, or bump last_seen on the ones already stored.
+    Rows are matched on (link_id, content_hash), so unchanged reviews keep their analysis.
+    Returns the number of distinct reviews written.
+    """
+    seen_at = seen_at or datetime.utcnow()
+    rows = {}
+    for r in reviews:
+        h = review_hash(r["text"])
+        row = {"link_id": link_id, "content_hash": h, "text": r["text"], "stars": r.get("stars"),
+               "first_seen": seen_at, "last_seen": seen_at}
+        # Backfilled reviews may already carry their analysis
+        row.update({f: r.get(f) for f in ANALYSIS_FIELDS})
+        rows.setdefault(h, row)
+
+    if not rows:
+        return 0
+
+    stmt = insert(Review).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_reviews_link_hash",
+        set_={
+            "stars": stmt.excluded.stars,
+            "last_seen": func.greatest(Review.last_seen, stmt.excluded.last_seen),
+            "first_seen": func.least(Review.first_seen, stmt.excluded.first_seen),
+        },
+    )
+    db.execute(stmt)
+    return len(rows)
+
+
+def touch_reviews(db, link_id, seen_at):
+    """
+    Mark every stored review of a link as seen at seen_at. Incremental scrapes stop at
+    the first stored review instead of re-reading them, so they carry the rest forward.
+    """
+    db.query(Review).filter(Review.link_id == link_id).update(
+        {Review.last_seen: func.greatest(Review.last_seen, seen_at)}, synchronize_session=False
+    )
+
+
+def known_review_hashes(db, link_ids):
+    """{link_id: set of stored content hashes}, for incremental scraping"""
+    known = {link_id: set() for link_id in link_ids}
+    rows = db.query(Review.link_id, Review.content_hash).filter(Review.link_id.in_(link_ids)).all()
+    for link_id, content_hash in rows:
+        known[link_id].add(content_hash)
+    return known
+
+
+def current_reviews(db, link_id):
+    """Reviews present in the link's most recent scrape"""
+    latest = db.query(func.max(Review.last_seen)).filter(Review.link_id == link_id).scalar_subquery()
+    return (
+        db.query(Review)
+        .filter(Review.link_id == link_id, Review.last_seen == latest)
+        .order_by(Review.id)
+        .all()
+    )
+
+
+def current_reviews_for_links(db, link_ids):
+    """current_reviews for many links in one query: {link_id: [Review, ...]}"""
+    latest = (
+        db.query(Review.link_id, func.max(Review.last_seen).label("last_seen"))
+        .filter(Review.link_id.in_(link_ids))
+        .group_by(Review.link_id)
+        .subquery()
+    )
+    rows = (
+        db.query(Review)
+        .join(latest, (Review.link_id == latest.c.link_id) & (Review.last_seen == latest.c.last_seen))
+        .order_by(Review.link_id, Review.id)
+        .all()
+    )
+    current = {link_id: [] for link_id in link_ids}
+    for row in rows:
+        current[row.link_id].append(row)
+    return current
+
+
+def review_to_dict(review):
+    return {"text": review.text, "stars": review.stars, **{f: getattr(review, f) for f in ANALYSIS_FIELDS}}
@@ -1,85 +1,151 @@
 # backend/app/routers/products.py
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 import backend.app.models as models
 import backend.app.schemas as schemas
-from ..database import get_db
-from ..dependencies import get_current_user
+from ..database import get_db, get_async_db
+from ..dependencies import get_current_user, get_current_user_async
+from ..user_cache import CurrentUser
+from ..history import rollup_history
 
 router = APIRouter(prefix="/api/products", tags=["products"])
 
+async def _load_product(db, product_id, user_id):
+    """The user's product with its links eagerly loaded (async sessions can't lazy-load)"""
+    result = await db.execute(
+        select(models.Product)
+        .options(selectinload(models.Product.links))
+        .where(
+            models.Product.id == product_id,
+            models.Product.user_id == user_id
+        )
+        # Refresh rows already in the session (e.g. server defaults after an insert)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
 @router.post("/", response_model=schemas.ProductOut)
-def create_product(
+async def create_product(
     product_in: schemas.ProductCreate,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
 ):
-    # Create product
-    db_product = models.Product(
-        user_id=current_user.id,
-        name=product_in.name,
-        image_url=product_in.image_url
-    )
-    db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
-
-    # Create all links
+    # Validate Amazon links before anything is written
     for link in product_in.links:
-        # Validate Amazon links
         if "amazon" not in link.url.lower():
-            db.rollback()
             raise HTTPException(
                 status_code=400, 
                 detail="Only Amazon product links are supported for review analysis"
             )
-        
-        db_link = models.ProductLink(
-            product_id=db_product.id,
-            platform=link.platform,
-            url=link.url
-        )
-        db.add(db_link)
 
-    db.commit()
+    # Create product and all links in one transaction
+    db_product = models.Product(
+        user_id=current_user.id,
+        name=product_in.name,
+        image_url=product_in.image_url
+    )
+    db_product.links = [
+        models.ProductLink(platform=link.platform, url=link.url)
+        for link in product_in.links
+    ]
+    db.add(db_product)
+    await db.commit()
 
-    # Trigger immediate scraping in background
+    # Trigger immediate scraping in background (the broker publish is blocking I/O)
     from ..celery_tasks import scrape_single_product
-    scrape_single_product.delay(db_product.id)
+    await run_in_threadpool(scrape_single_product.delay, db_product.id)
 
     # Reload product WITH links
-    db_product = (
-        db.query(models.Product)
-        .options(joinedload(models.Product.links))
-        .filter(models.Product.id == db_product.id)
-        .first()
+    return await _load_product(db, db_product.id, current_user.id)
+
+
+@router.get("/", response_model=List[schemas.ProductOut])
+async def get_products(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
+):
+    result = await db.execute(
+        select(models.Product)
+        .options(selectinload(models.Product.links))
+        .where(models.Product.user_id == current_user.id)
     )
+    return result.scalars().all()
 
-    return db_product
 
+@router.get("/{product_id}", response_model=schemas.ProductOut)
+async def get_product(
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
+):
+    product = await _load_product(db, product_id, current_user.id)
+    
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    return product
 
-@router.get("/", response_model=List[schemas.ProductOut])
-def get_products(
+
+@router.get("/{product_id}/links/{link_id}/reviews", response_model=schemas.ReviewPage)
+def get_link_reviews(
+    product_id: int,
+    link_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    is_fake: Optional[bool] = None,
+    sentiment: Optional[str] = Query(None, pattern="^(?i:positive|negative)$"),
+    stars: Optional[int] = Query(None, ge=1, le=5),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    products = (
-        db.query(models.Product)
-        .options(joinedload(models.Product.links))
-        .filter(models.Product.user_id == current_user.id)
-        .all()
+    """Reviews for one link, newest first, with keyset (cursor) pagination"""
+    link = (
+        db.query(models.ProductLink)
+        .join(models.Product)
+        .filter(
+            models.ProductLink.id == link_id,
+            models.ProductLink.product_id == product_id,
+            models.Product.user_id == current_user.id
+        )
+        .first()
     )
-    return products
+    
+    if not link:
+        raise HTTPException(status_code=404, detail="Link not found")
+    
+    query = db.query(models.Review).filter(models.Review.link_id == link_id)
+    if is_fake is not None:
+        query = query.filter(models.Review.is_fake == is_fake)
+    if sentiment:
+        query = query.filter(models.Review.sentiment == sentiment.upper())
+    if stars is not None:
+        query = query.filter(models.Review.stars == stars)
+    if cursor:
+        if not cursor.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(models.Review.id < int(cursor))
+    
+    # Fetch one extra row to know whether there is a next page
+    rows = query.order_by(models.Review.id.desc()).limit(limit + 1).all()
+    next_cursor = str(rows[limit - 1].id) if len(rows) > limit else None
+    
+    return {"items": rows[:limit], "next_cursor": next_cursor}
 
 
-@router.get("/{product_id}", response_model=schemas.ProductOut)
-def get_product(
+@router.get("/{product_id}/history", response_model=List[schemas.HistoryPoint])
+def get_product_history(
     product_id: int,
+    period: str = Query("day", pattern="^(day|week)$"),
+    days: int = Query(180, ge=1, le=3650),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
+    """Rating, fake ratio and sentiment trends per link, read from the daily/weekly rollups"""
     product = (
         db.query(models.Product)
         .options(joinedload(models.Product.links))
@@ -93,44 +159,44 @@ def get_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    return product
+    return rollup_history(db, [link.id for link in product.links], period=period, days=days)
 
 
 @router.post("/{product_id}/scrape")
-def trigger_scrape(
+async def trigger_scrape(
     product_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
 ):
     """Manually trigger scraping for a product"""
-    product = db.query(models.Product).filter(
-        models.Product.id == product_id,
-        models.Product.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(models.Product.id).where(
+            models.Product.id == product_id,
+            models.Product.user_id == current_user.id
+        )
+    )
     
-    if not product:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Product not found")
     
     from backend.app.celery_tasks import scrape_single_product
-    task = scrape_single_product.delay(product_id)
+    task = await run_in_threadpool(scrape_single_product.delay, product_id)
     
     return {"message": "Scraping started", "task_id": task.id}
 
 
 @router.delete("/{product_id}")
-def delete_product(
+async def delete_product(
     product_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
 ):
-    product = db.query(models.Product).filter(
-        models.Product.id == product_id,
-        models.Product.user_id == current_user.id
-    ).first()
+    # Links are loaded up front so the ORM cascade doesn't lazy-load them
+    product = await _load_product(db, product_id, current_user.id)
     
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    db.delete(product)
-    db.commit()
-    return {"message": "Product deleted successfully"}
\ No newline at end of file
+    await db.delete(product)
+    await db.commit()
+    return {"message": "Product deleted successfully"}
@@ -1,7 +1,7 @@
 # backend/app/schemas.py
 from pydantic import BaseModel, HttpUrl
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, date
 
 class ProductLinkCreate(BaseModel):
     platform: str
@@ -21,7 +21,6 @@ class ProductLinkOut(BaseModel):
     sentiment_score: Optional[float] = None
     last_scraped: Optional[datetime] = None  
     scrape_note: Optional[str] = None  
-    reviews_json: Optional[List[Dict[str, Any]]] = None  
 
     class Config:
         from_attributes = True
@@ -34,4 +33,33 @@ class ProductOut(BaseModel):
     links: List[ProductLinkOut]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ReviewOut(BaseModel):
+    id: int
+    text: str
+    stars: Optional[int] = None
+    is_fake: Optional[bool] = None
+    fake_probability: Optional[float] = None
+    sentiment: Optional[str] = None
+    sentiment_score: Optional[float] = None
+    first_seen: datetime
+    last_seen: datetime
+
+    class Config:
+        from_attributes = True
+
+class ReviewPage(BaseModel):
+    items: List[ReviewOut]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
+
+class HistoryPoint(BaseModel):
+    link_id: int
+    period_start: date
+    samples: int
+    rating_min: Optional[float] = None
+    rating_max: Optional[float] = None
+    rating_avg: Optional[float] = None
+    fake_ratio_avg: Optional[float] = None
+    sentiment_avg: Optional[float] = None
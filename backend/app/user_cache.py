@@ -0,0 +1,54 @@
+# backend/app/user_cache.py
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+import time
+import os
+
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))  # seconds
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """What routes need about the authenticated user, without an ORM row"""
+    id: int
+    clerk_id: str
+    email: str
+
+
+class UserCache:
+    """Process-level clerk_id -> CurrentUser map with a TTL and explicit invalidation"""
+
+    def __init__(self, ttl=USER_CACHE_TTL, max_size=USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clerk_id):
+        with self._lock:
+            entry = self._entries.get(clerk_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[clerk_id]
+                return None
+            self._entries.move_to_end(clerk_id)
+            return user
+
+    def put(self, user):
+        with self._lock:
+            self._entries[user.clerk_id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.clerk_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, clerk_id=None):
+        """Drop one user (e.g. after an email change or deletion), or everyone if clerk_id is None"""
+        with self._lock:
+            if clerk_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(clerk_id, None)
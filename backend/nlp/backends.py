@@ -0,0 +1,148 @@
+# backend/nlp/backends.py
+# CPU inference backends for the DistilBERT classifiers (fake review + sentiment):
+#   torch - PyTorch fp32, the reference
+#   int8  - PyTorch dynamic int8 quantization of the Linear layers
+#   onnx  - ONNX Runtime on an exported graph, with transformer fusions applied
+# Every backend takes numpy input_ids/attention_mask and returns numpy logits.
+import inspect
+import os
+
+import numpy as np
+import torch
+
+from .model_registry import NLP_BACKEND, NLP_ONNX_DIR
+
+ONNX_OPSET = 17
+BACKENDS = ("torch", "int8", "onnx")
+
+
+def softmax(logits):
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class TorchClassifier:
+    def __init__(self, model, device="cpu"):
+        self.device = device
+        self.model = model.eval().to(device)
+
+    def __call__(self, input_ids, attention_mask):
+        with torch.no_grad():
+            return self.model(
+                input_ids=torch.from_numpy(input_ids).to(self.device),
+                attention_mask=torch.from_numpy(attention_mask).to(self.device),
+            ).logits.cpu().numpy()
+
+
+def quantize_int8(model):
+    """Dynamic quantization: int8 Linear weights, activations quantized per batch at run time"""
+    return torch.ao.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Plain (input_ids, attention_mask) -> logits signature for the exporter"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+
+def export_onnx(model, path):
+    """Export with dynamic batch/sequence axes, then fuse attention/GELU/LayerNorm where onnxruntime can"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    sample = (torch.ones((2, 8), dtype=torch.int64), torch.ones((2, 8), dtype=torch.int64))
+    # Newer torch defaults to the dynamo exporter; the TorchScript one handles HF models without extras
+    legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    torch.onnx.export(
+        _LogitsOnly(model.eval()), sample, tmp,
+        input_names=["input_ids", "attention_mask"], output_names=["logits"],
+        dynamic_axes={"input_ids": {0: "batch", 1: "sequence"}, "attention_mask": {0: "batch", 1: "sequence"},
+                      "logits": {0: "batch"}},
+        opset_version=ONNX_OPSET, **legacy,
+    )
+
+    try:
+        from onnxruntime.transformers import optimizer
+        config = model.config
+        optimized = optimizer.optimize_model(tmp, model_type="bert", num_heads=config.n_heads, hidden_size=config.dim)
+        optimized.save_model_to_file(tmp)
+        print(f"[MODELS] ONNX fusions: {optimized.get_fused_operator_statistics()}")
+    except Exception as e:
+        print(f"[MODELS] ONNX transformer fusions skipped, using the exported graph: {e}")
+    os.replace(tmp, path)
+
+
+class OnnxClassifier:
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads or torch.get_num_threads()
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def __call__(self, input_ids, attention_mask):
+        return self.session.run(["logits"], {"input_ids": input_ids, "attention_mask": attention_mask})[0]
+
+
+def onnx_path(name, version, onnx_dir=NLP_ONNX_DIR):
+    return os.path.join(onnx_dir, f"{name}-v{version}.onnx")
+
+
+def make_classifier(load_model, backend=NLP_BACKEND, name=None, version="1", onnx_dir=NLP_ONNX_DIR):
+    """
+    Classifier on the chosen backend. load_model(**from_pretrained_kwargs) returns the fp32
+    HF model; with an ONNX graph already exported for (name, version) it is never called,
+    so ONNX workers skip loading PyTorch weights altogether.
+    """
+    if backend == "torch":
+        return TorchClassifier(load_model(), "cuda" if torch.cuda.is_available() else "cpu")
+    if backend == "int8":
+        return TorchClassifier(quantize_int8(load_model()))
+    if backend == "onnx":
+        path = onnx_path(name, version, onnx_dir)
+        if not os.path.exists(path):
+            print(f"[MODELS] Exporting {name} to {path}")
+            # Eager attention exports the pattern onnxruntime fuses into its Attention op (SDPA doesn't)
+            export_onnx(load_model(attn_implementation="eager"), path)
+        return OnnxClassifier(path)
+    raise ValueError(f"Unknown NLP_BACKEND '{backend}', expected one of {BACKENDS}")
+
+
+def run_bucketed(tokenizer, texts, max_length, bucket_size, fn):
+    """
+    fn(input_ids, attention_mask) -> array (or tuple of arrays) with one row per text, run
+    bucket by bucket over length-sorted texts so each bucket is only padded to its own
+    longest text. Rows come back in the original order.
+    """
+    encoded = tokenizer(texts, truncation=True, max_length=max_length)
+    lengths = np.array([len(ids) for ids in encoded["input_ids"]])
+    order = np.argsort(lengths, kind="stable")
+
+    outputs = None
+    for start in range(0, len(order), bucket_size):
+        bucket = order[start:start + bucket_size]
+        inputs = tokenizer.pad(
+            {key: [encoded[key][i] for i in bucket] for key in ("input_ids", "attention_mask")},
+            return_tensors="np"
+        )
+        result = fn(inputs["input_ids"].astype(np.int64), inputs["attention_mask"].astype(np.int64))
+        parts = result if isinstance(result, tuple) else (result,)
+        if outputs is None:
+            outputs = [np.empty((len(texts),) + part.shape[1:], dtype=part.dtype) for part in parts]
+        # Scatter back to the original order
+        for out, part in zip(outputs, parts):
+            out[bucket] = part
+    return tuple(outputs) if isinstance(result, tuple) else outputs[0]
+
+
+def classify(tokenizer, classifier, texts, max_length, bucket_size):
+    """Class probabilities (len(texts), num_labels); a tuple of them for multi-head classifiers"""
+    if not texts:
+        return np.empty((0, 2), dtype=np.float32)
+    logits = run_bucketed(tokenizer, texts, max_length, bucket_size, classifier)
+    return tuple(softmax(head) for head in logits) if isinstance(logits, tuple) else softmax(logits)
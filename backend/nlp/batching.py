@@ -0,0 +1,145 @@
+# backend/nlp/batching.py
+from concurrent.futures import Future
+from collections import deque
+import threading
+import time
+import os
+
+import numpy as np
+
+FAKE_BATCH_MAX_SIZE = int(os.getenv("FAKE_BATCH_MAX_SIZE", "64"))       # reviews per model pass
+FAKE_BATCH_MAX_WAIT_MS = float(os.getenv("FAKE_BATCH_MAX_WAIT_MS", "50"))
+# Upper bound on waiting for a batched result (the first batch in a process includes model loading)
+FAKE_BATCH_RESULT_TIMEOUT = float(os.getenv("FAKE_BATCH_RESULT_TIMEOUT", "600"))
+
+
+class _Request:
+    def __init__(self, reviews):
+        self.reviews = reviews
+        self.future = Future()
+        self.submitted = time.monotonic()
+
+
+class FakeReviewBatcher:
+    """
+    Collects reviews from many links into size- and time-bounded batches so the
+    fake-review ensemble runs once per batch instead of once per link.
+    submit() returns a Future resolving to (reviews, fake_ratio), exactly what
+    predict_fake_ensemble returns for that link on its own.
+    """
+
+    def __init__(self, max_batch_size=FAKE_BATCH_MAX_SIZE, max_wait_ms=FAKE_BATCH_MAX_WAIT_MS, score_fn=None):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._score_fn = score_fn
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._batch_sizes = deque(maxlen=1000)
+        self._latencies = deque(maxlen=1000)
+        self._batches = 0
+        self._reviews = 0
+
+    def _score(self, texts):
+        if self._score_fn is None:
+            # Deferred so importing this module never loads the models
+            from .fake_detector import score_fake_probabilities
+            self._score_fn = score_fake_probabilities
+        return self._score_fn(texts)
+
+    def submit(self, reviews):
+        request = _Request(reviews)
+        if not reviews:
+            request.future.set_result((reviews, 0.0))
+            return request.future
+
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="fake-batcher", daemon=True)
+                self._thread.start()
+            self._pending.append(request)
+            self._cond.notify()
+        return request.future
+
+    def predict(self, reviews):
+        """Blocking convenience wrapper around submit()"""
+        return self.submit(reviews).result(timeout=FAKE_BATCH_RESULT_TIMEOUT)
+
+    def _next_batch(self):
+        """Wait for the first request, then gather more until the batch is full or max_wait has passed"""
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = self._pending[0].submitted + self.max_wait
+            while sum(len(r.reviews) for r in self._pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            # A single oversized request still goes through as one batch
+            batch, size = [], 0
+            while self._pending and (not batch or size + len(self._pending[0].reviews) <= self.max_batch_size):
+                request = self._pending.popleft()
+                batch.append(request)
+                size += len(request.reviews)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                texts = self._run_batch(batch)
+            except Exception as e:
+                # Never let the thread die with callers waiting: fail whatever is still pending
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+
+            self._batches += 1
+            self._reviews += len(texts)
+            self._batch_sizes.append(len(texts))
+
+    def _run_batch(self, batch):
+        from .fake_detector import clean_text, apply_fake_probabilities
+
+        texts = [clean_text(r["text"]) for request in batch for r in request.reviews]
+        probs = self._score(texts)
+
+        # Split the batch back out to the right callers
+        offset = 0
+        done = time.monotonic()
+        for request in batch:
+            n = len(request.reviews)
+            fake_ratio = apply_fake_probabilities(request.reviews, probs[offset:offset + n])
+            offset += n
+            self._latencies.append(done - request.submitted)
+            request.future.set_result((request.reviews, fake_ratio))
+        return texts
+
+    def stats(self):
+        """Batch size and per-request latency (queue wait + inference) over the recent window"""
+        sizes = np.array(self._batch_sizes or [0])
+        latencies = np.array(self._latencies or [0.0]) * 1000
+        return {
+            "batches": self._batches,
+            "reviews": self._reviews,
+            "avg_batch_size": round(float(sizes.mean()), 1),
+            "max_batch_size": int(sizes.max()),
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 1),
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)), 1),
+        }
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_fake_batcher():
+    """Process-wide batcher shared by every inference task in this worker"""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = FakeReviewBatcher()
+        return _batcher
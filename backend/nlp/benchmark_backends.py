@@ -0,0 +1,48 @@
+# backend/nlp/benchmark_backends.py
+# Throughput and latency of the DistilBERT fake-review classifier per inference backend.
+# The sentiment model has the same architecture, so its numbers track these.
+# Run from the repo root: python -m backend.nlp.benchmark_backends
+# BENCH_RANDOM_WEIGHTS=true works without the trained weights (timing doesn't depend on them).
+import tempfile
+import time
+import os
+
+import numpy as np
+import torch
+
+from .backends import make_classifier, classify, BACKENDS
+from .check_backends import model_loaders, review_texts
+
+BENCH_REVIEWS = int(os.getenv("BENCH_REVIEWS", "256"))
+BENCH_LATENCY_CALLS = int(os.getenv("BENCH_LATENCY_CALLS", "50"))
+
+
+def main():
+    tokenizer, load_model = model_loaders()["fake"]
+    texts = review_texts(BENCH_REVIEWS)[:BENCH_REVIEWS]
+    print(f"{len(texts)} reviews, {torch.get_num_threads()} threads\n")
+    print(f"{'backend':8s} {'setup s':>8s} {'reviews/s':>10s} {'p50 ms':>8s} {'p95 ms':>8s}   (single-review latency)")
+
+    with tempfile.TemporaryDirectory() as onnx_dir:
+        for backend in BACKENDS:
+            start = time.perf_counter()
+            classifier = make_classifier(load_model, backend, "fake", "bench", onnx_dir)
+            setup = time.perf_counter() - start
+
+            classify(tokenizer, classifier, texts[:16], max_length=256, bucket_size=16)  # warm up
+            start = time.perf_counter()
+            classify(tokenizer, classifier, texts, max_length=256, bucket_size=16)
+            throughput = len(texts) / (time.perf_counter() - start)
+
+            latencies = []
+            for text in texts[:BENCH_LATENCY_CALLS]:
+                start = time.perf_counter()
+                classify(tokenizer, classifier, [text], max_length=256, bucket_size=1)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            print(f"{backend:8s} {setup:8.1f} {throughput:10.1f} "
+                  f"{np.percentile(latencies, 50):8.1f} {np.percentile(latencies, 95):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
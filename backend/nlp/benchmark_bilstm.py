@@ -0,0 +1,95 @@
+# backend/nlp/benchmark_bilstm.py
+# BiLSTM inference: the padded 100-step path against packed sequences over true lengths
+# (eager and TorchScript), and how far the packed predictions move from the padded ones.
+# Run from the repo root: python -m backend.nlp.benchmark_bilstm
+# Like benchmark_memory, the checkpoint is random by default (model files are often LFS
+# pointers); BENCH_REAL_FILES=true uses the trained one, which is what the prediction
+# comparison should be read from before turning BILSTM_PACKED on.
+import tempfile
+import random
+import time
+import sys
+import os
+
+import numpy as np
+import torch
+
+from .benchmark_memory import write_files, real_paths, BENCH_REAL_FILES
+from .benchmark_tokenization import sample_reviews
+from .check_backends import review_texts
+from .fake_detector import (
+    clean_text, load_bilstm, load_packed_bilstm, bilstm_fake_probs, packed_bilstm_fake_probs, BILSTM_MAX_LEN,
+)
+from .model_registry import models
+from .vocab import read_word_to_idx
+
+BENCH_REVIEWS = int(os.getenv("BENCH_REVIEWS", "512"))
+BENCH_THREADS = [int(n) for n in os.getenv("BENCH_THREADS", "1").split(",")]
+
+
+def benchmark_texts(vocabulary, n):
+    """Scraped fixture reviews plus n with log-normal word counts drawn from the vocabulary"""
+    rng = random.Random(0)
+    synthetic = [" ".join(rng.choice(vocabulary) for _ in text.split()) for text in sample_reviews(n)]
+    return [clean_text(t) for t in review_texts(0)] + synthetic
+
+
+def timed(fn, texts, repeat=3):
+    fn(texts[:64])  # warm up (TorchScript optimizes on the first calls)
+    fn(texts[:64])
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(texts)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    torch.manual_seed(0)  # the random checkpoint's LSTM/fc weights
+    with tempfile.TemporaryDirectory() as tmp:
+        word_to_idx = read_word_to_idx()
+        paths = real_paths() if BENCH_REAL_FILES else write_files(tmp, word_to_idx)
+        models.register("bilstm", lambda: load_bilstm(paths["weights"], paths["word_index"], paths["word_to_idx"]))
+        texts = benchmark_texts(list(word_to_idx), BENCH_REVIEWS)
+        words = np.array([min(len(t.split()), BILSTM_MAX_LEN) for t in texts])
+        print(f"{len(texts)} reviews, mean {words.mean():.1f} words (BiLSTM steps per review: "
+              f"padded {BILSTM_MAX_LEN}, packed {np.maximum(words, 1).mean():.1f})"
+              + ("" if BENCH_REAL_FILES else ", random weights"))
+
+        eager, scripted = load_packed_bilstm(jit=False), load_packed_bilstm(jit=True)
+        variants = {
+            "padded (current)": lambda t: bilstm_fake_probs(t, packed=False),
+            "packed eager": lambda t: packed_bilstm_fake_probs(t, model=eager),
+            "packed TorchScript": lambda t: packed_bilstm_fake_probs(t, model=scripted),
+        }
+        for threads in BENCH_THREADS:
+            torch.set_num_threads(threads)
+            print(f"\n{threads} thread(s)           reviews/s   speedup")
+            baseline = None
+            for name, fn in variants.items():
+                seconds, _ = timed(fn, texts)
+                baseline = baseline or seconds
+                print(f"  {name:20s} {len(texts) / seconds:9.0f} {baseline / seconds:8.2f}x")
+
+        padded = bilstm_fake_probs(texts, packed=False)
+        packed = packed_bilstm_fake_probs(texts, model=scripted)
+
+    diff = np.abs(packed - padded)
+    flips = (packed > 0.5) != (padded > 0.5)
+    # Random weights tend to put every review on one side of 0.5, which hides flips; also
+    # compare at the threshold that splits the padded predictions in half
+    median = np.median(padded)
+    median_flips = (packed > median) != (padded > median)
+    print("\nPacked vs padded predictions     reviews   mean |dp|   max |dp|   flipped @0.5   flipped @median")
+    for label, mask in (("< 25 words", words < 25), ("25-99 words", (words >= 25) & (words < BILSTM_MAX_LEN)),
+                        (f">= {BILSTM_MAX_LEN} words", words >= BILSTM_MAX_LEN), ("all", words >= 0)):
+        if mask.any():
+            print(f"  {label:30s} {mask.sum():8d} {diff[mask].mean():11.4f} {diff[mask].max():10.4f} "
+                  f"{flips[mask].mean():14.2%} {median_flips[mask].mean():17.2%}")
+    print(f"  padded fake rate {np.mean(padded > 0.5):.2%}, packed fake rate {np.mean(packed > 0.5):.2%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
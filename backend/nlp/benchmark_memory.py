@@ -0,0 +1,153 @@
+# backend/nlp/benchmark_memory.py
+# Memory of N forked inference workers holding the BiLSTM: the old loading (np.load of
+# the embedding, pickled word_to_idx dict, torch.load copied into the model) against
+# the memory-mapped checkpoint and word index.
+# Run from the repo root: python -m backend.nlp.benchmark_memory [workers ...]
+# Model files are often LFS pointers in a checkout, so by default the benchmark writes
+# same-shaped files to a temp dir: the real vocabulary, a float64 300-d embedding .npy
+# and a checkpoint saved from that embedding. BENCH_REAL_FILES=true uses backend/nlp.
+import multiprocessing as mp
+import tempfile
+import pickle
+import random
+import sys
+import os
+
+import numpy as np
+import torch
+
+from .fake_detector import BiLSTM, load_bilstm
+from .model_registry import BILSTM_WEIGHTS_PATH, WORD_TO_IDX_PATH, NLP_MODEL_DIR
+from .vocab import build_word_index, save_word_index, read_word_to_idx
+
+BENCH_REAL_FILES = os.getenv("BENCH_REAL_FILES", "false").lower() == "true"
+BENCH_REVIEWS = int(os.getenv("BENCH_REVIEWS", "256"))
+EMBEDDING_DIM = 300
+
+
+def write_files(tmp, word_to_idx):
+    """Embedding .npy, checkpoint and word index shaped like the trained model's"""
+    paths = {
+        "embedding": os.path.join(tmp, "embedding_matrix.npy"),
+        "weights": os.path.join(tmp, "bilstm_fake_review.pth"),
+        "word_to_idx": os.path.join(tmp, "word_to_idx.pkl"),
+        "word_index": os.path.join(tmp, "word_index.npy"),
+    }
+    embedding = np.random.default_rng(0).standard_normal((len(word_to_idx), EMBEDDING_DIM))  # float64, like GloVe
+    np.save(paths["embedding"], embedding)
+    torch.save(BiLSTM(embedding).state_dict(), paths["weights"])
+    with open(paths["word_to_idx"], "wb") as f:
+        pickle.dump(word_to_idx, f)
+    save_word_index(build_word_index(word_to_idx), paths["word_index"])
+    return paths
+
+
+def real_paths():
+    return {
+        "embedding": os.path.join(NLP_MODEL_DIR, "embedding_matrix.npy"),
+        "weights": BILSTM_WEIGHTS_PATH,
+        "word_to_idx": WORD_TO_IDX_PATH,
+        "word_index": os.path.join(tempfile.mkdtemp(), "word_index.npy"),
+    }
+
+
+def old_load(paths):
+    """What importing fake_detector used to keep alive: the matrix, the dict and the model"""
+    embedding_matrix = np.load(paths["embedding"])
+    with open(paths["word_to_idx"], "rb") as f:
+        word_to_idx = pickle.load(f)
+    model = BiLSTM(embedding_matrix)
+    model.load_state_dict(torch.load(paths["weights"], map_location="cpu"))
+    model.eval()
+    return (embedding_matrix, model), lambda words: [word_to_idx.get(w, 1) for w in words]
+
+
+def new_load(paths):
+    word_index, model = load_bilstm(paths["weights"], paths["word_index"], paths["word_to_idx"])
+    return (model,), word_index.lookup
+
+
+LOADERS = {"none": None, "old": old_load, "mmap": new_load}
+
+
+def sample_reviews(words, n, seed=0):
+    rng = random.Random(seed)
+    return [[rng.choice(words) for _ in range(rng.randint(5, 100))] for _ in range(n)]
+
+
+def worker(mode, paths, reviews, conn):
+    torch.set_num_threads(1)
+    loader = LOADERS[mode]
+    if loader is not None:
+        (*_, model), lookup = loader(paths)
+        # One realistic batch so the pages inference touches are resident
+        indices = np.zeros((len(reviews), 100), dtype=np.int64)
+        for row, words in enumerate(reviews):
+            indices[row, :len(words)] = lookup(words)
+        with torch.no_grad():
+            model(torch.from_numpy(indices))
+    conn.send("ready")
+    conn.recv()
+
+
+def memory_of(pid):
+    """Rss, Pss and private (unique) bytes of a process, from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return fields["Rss"], fields["Pss"], fields["Private_Clean"] + fields["Private_Dirty"]
+
+
+def measure(mode, n_workers, paths, reviews):
+    ctx = mp.get_context("fork")
+    procs, conns = [], []
+    for _ in range(n_workers):
+        parent_conn, child_conn = ctx.Pipe()
+        proc = ctx.Process(target=worker, args=(mode, paths, reviews, child_conn))
+        proc.start()
+        procs.append(proc)
+        conns.append(parent_conn)
+    for conn in conns:
+        conn.recv()
+
+    usage = np.array([memory_of(proc.pid) for proc in procs], dtype=np.float64) / 2**20
+    for conn in conns:
+        conn.send("exit")
+    for proc in procs:
+        proc.join()
+    return usage
+
+
+def main():
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print("Needs Linux (/proc/<pid>/smaps_rollup)")
+        return 1
+    worker_counts = [int(n) for n in sys.argv[1:]] or [4, 8]
+    torch.set_num_threads(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        word_to_idx = read_word_to_idx()
+        paths = real_paths() if BENCH_REAL_FILES else write_files(tmp, word_to_idx)
+        reviews = sample_reviews(list(word_to_idx), BENCH_REVIEWS)
+        print(f"Vocabulary: {len(word_to_idx)} words, embedding .npy "
+              f"{os.path.getsize(paths['embedding']) / 2**20:.0f} MB, checkpoint "
+              f"{os.path.getsize(paths['weights']) / 2**20:.0f} MB")
+
+        for n in worker_counts:
+            print(f"\n{n} workers (MB)      RSS/worker   sum RSS   sum PSS   sum private")
+            baseline = None
+            for mode in LOADERS:
+                usage = measure(mode, n, paths, reviews)
+                rss, pss, private = usage[:, 0], usage[:, 1], usage[:, 2]
+                extra = "" if baseline is None else f"   (+{pss.sum() - baseline:.0f} MB PSS over no model)"
+                print(f"  {mode:16s} {rss.mean():10.0f} {rss.sum():9.0f} {pss.sum():9.0f} {private.sum():11.0f}{extra}")
+                if mode == "none":
+                    baseline = pss.sum()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# backend/nlp/check_backends.py
+# Accuracy parity of the int8 and ONNX backends against PyTorch fp32: fake-review
+# probabilities and decisions, sentiment labels and scores, on the same reviews.
+# Run from the repo root: python -m backend.nlp.check_backends
+# BENCH_RANDOM_WEIGHTS=true builds both models from their configs with random weights
+# (checkouts without the LFS weights or hub access); parity is then informational only.
+import tempfile
+import sys
+import os
+
+import numpy as np
+import torch
+
+from .backends import make_classifier, classify, BACKENDS
+from .benchmark_tokenization import sample_reviews
+from .model_registry import DISTILBERT_PATH, SENTIMENT_MODEL
+from ..scraper.check_fixtures import EXPECTED, load
+from ..scraper.parsers import parse_reviews
+
+BENCH_RANDOM_WEIGHTS = os.getenv("BENCH_RANDOM_WEIGHTS", "false").lower() == "true"
+PARITY_MAX_FLIP_RATE = float(os.getenv("PARITY_MAX_FLIP_RATE", "0.01"))   # fake decisions / sentiment labels
+PARITY_MAX_PROB_DIFF = float(os.getenv("PARITY_MAX_PROB_DIFF", "0.05"))
+
+
+def model_loaders(random_weights=BENCH_RANDOM_WEIGHTS):
+    """{"fake"/"sentiment": (tokenizer, load_model)}; every load_model() call returns the same fp32 weights"""
+    from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
+
+    def loader(path, seed):
+        def load_model(**kwargs):
+            if not random_weights:
+                return AutoModelForSequenceClassification.from_pretrained(path, **kwargs)
+            # Same architecture and tokenizer as the fake-review model, seeded per model
+            torch.manual_seed(seed)
+            config = AutoConfig.from_pretrained(DISTILBERT_PATH, id2label={0: "NEGATIVE", 1: "POSITIVE"}, **kwargs)
+            return AutoModelForSequenceClassification.from_config(config)
+        return load_model
+
+    return {
+        name: (AutoTokenizer.from_pretrained(DISTILBERT_PATH if random_weights else path), loader(path, seed))
+        for seed, (name, path) in enumerate((("fake", DISTILBERT_PATH), ("sentiment", SENTIMENT_MODEL)))
+    }
+
+
+def build_classifiers(loaders, backend, onnx_dir):
+    return {
+        name: (tokenizer, make_classifier(load_model, backend, name, "parity", onnx_dir))
+        for name, (tokenizer, load_model) in loaders.items()
+    }
+
+
+def review_texts(n_synthetic=200):
+    """Scraped fixture reviews plus synthetic ones with a realistic length spread"""
+    texts = [r["text"] for name, (platform, *_) in EXPECTED.items() for r in parse_reviews(platform, load(name))["reviews"]]
+    return texts + sample_reviews(n_synthetic)
+
+
+def predict(classifiers, texts):
+    tokenizer, classifier = classifiers["fake"]
+    fake = classify(tokenizer, classifier, texts, max_length=256, bucket_size=16)[:, 1]
+    tokenizer, classifier = classifiers["sentiment"]
+    sentiment = classify(tokenizer, classifier, texts, max_length=512, bucket_size=16)
+    return fake, sentiment
+
+
+def main():
+    torch.manual_seed(0)
+    texts = review_texts()
+    loaders = model_loaders()
+    failures = []
+
+    with tempfile.TemporaryDirectory() as onnx_dir:
+        ref_fake, ref_sentiment = predict(build_classifiers(loaders, "torch", onnx_dir), texts)
+        print(f"{len(texts)} reviews, reference: PyTorch fp32"
+              + (" (random weights, informational only)" if BENCH_RANDOM_WEIGHTS else ""))
+
+        for backend in BACKENDS[1:]:
+            fake, sentiment = predict(build_classifiers(loaders, backend, onnx_dir), texts)
+            prob_diff = np.abs(fake - ref_fake)
+            fake_flips = np.mean((fake > 0.5) != (ref_fake > 0.5))
+            label_flips = np.mean(sentiment.argmax(axis=1) != ref_sentiment.argmax(axis=1))
+            score_diff = np.abs(sentiment.max(axis=1) - ref_sentiment.max(axis=1))
+
+            print(f"\n{backend}:")
+            print(f"  fake probability  max |dp| {prob_diff.max():.4f}, mean {prob_diff.mean():.4f}, "
+                  f"decisions flipped {fake_flips:.2%}")
+            print(f"  sentiment         labels flipped {label_flips:.2%}, max |d score| {score_diff.max():.4f}")
+
+            if prob_diff.max() > PARITY_MAX_PROB_DIFF or fake_flips > PARITY_MAX_FLIP_RATE:
+                failures.append(f"{backend} fake")
+            if label_flips > PARITY_MAX_FLIP_RATE:
+                failures.append(f"{backend} sentiment")
+
+    if failures and not BENCH_RANDOM_WEIGHTS:
+        print(f"\nParity check failed: {', '.join(failures)}")
+        return 1
+    print("\nParity check passed" if not failures else "\nOutside thresholds, but the weights are random")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
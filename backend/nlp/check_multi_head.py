@@ -0,0 +1,84 @@
+# backend/nlp/check_multi_head.py
+# Shared-encoder mode against the two-model path on the same reviews: DistilBERT fake
+# probabilities (should be identical), sentiment label agreement and score drift, and
+# the CPU time of both paths.
+# Run from the repo root: python -m backend.nlp.check_multi_head
+# Uses SENTIMENT_HEAD_PATH when it exists; otherwise (and always with BENCH_RANDOM_WEIGHTS=true)
+# fits a head on the check's own reviews first, which flatters the agreement numbers.
+import time
+import sys
+import os
+
+import numpy as np
+import torch
+
+from .backends import TorchClassifier, classify
+from .benchmark_tokenization import sample_reviews
+from .check_backends import model_loaders, review_texts, BENCH_RANDOM_WEIGHTS, PARITY_MAX_FLIP_RATE
+from .fake_detector import clean_text, FAKE_BUCKET_SIZE
+from .model_registry import SENTIMENT_HEAD_PATH
+from .multi_head import MultiHeadDistilBert, ClassificationHead, SharedClassifier, SHARED_MAX_LENGTH, fit_head
+
+SHARED_FIT_REVIEWS = int(os.getenv("SHARED_FIT_REVIEWS", "1000"))
+
+
+def cpu_time(fn):
+    start = time.process_time()
+    result = fn()
+    return result, time.process_time() - start
+
+
+def main():
+    torch.manual_seed(0)
+    loaders = model_loaders()
+    (tokenizer, load_fake), (sst_tokenizer, load_sentiment) = loaders["fake"], loaders["sentiment"]
+    fake_model, sst_model = load_fake(), load_sentiment()
+    texts = review_texts()
+    cleaned = [clean_text(t) for t in texts]
+
+    if os.path.exists(SENTIMENT_HEAD_PATH) and not BENCH_RANDOM_WEIGHTS:
+        saved = torch.load(SENTIMENT_HEAD_PATH, map_location="cpu", weights_only=True)
+        head = ClassificationHead(fake_model.config.dim, len(saved["labels"]))
+        head.load_state_dict(saved["state_dict"])
+        print(f"Head: {SENTIMENT_HEAD_PATH} (holdout agreement when fitted {saved['holdout_agreement']:.2%})")
+    else:
+        fit_texts = list(dict.fromkeys(texts + sample_reviews(SHARED_FIT_REVIEWS)))
+        head, agreement = fit_head(tokenizer, fake_model, sst_tokenizer, sst_model, fit_texts)
+        print(f"Head: fitted on {len(fit_texts)} reviews here (holdout agreement {agreement:.2%})")
+
+    fake_classifier, sst_classifier = TorchClassifier(fake_model), TorchClassifier(sst_model)
+    shared = SharedClassifier(MultiHeadDistilBert(fake_model, head))
+
+    def two_models():
+        fake = classify(tokenizer, fake_classifier, cleaned, max_length=256, bucket_size=FAKE_BUCKET_SIZE)
+        return fake, classify(sst_tokenizer, sst_classifier, texts, max_length=512, bucket_size=16)
+
+    def one_pass():
+        return classify(tokenizer, shared, cleaned, max_length=SHARED_MAX_LENGTH, bucket_size=FAKE_BUCKET_SIZE)
+
+    two_models()  # warm up
+    (ref_fake, ref_sentiment), ref_cpu = cpu_time(two_models)
+    (fake, sentiment), cpu = cpu_time(one_pass)
+
+    prob_diff = np.abs(fake[:, 1] - ref_fake[:, 1])
+    label_flips = np.mean(sentiment.argmax(axis=1) != ref_sentiment.argmax(axis=1))
+    score_diff = np.abs(sentiment.max(axis=1) - ref_sentiment.max(axis=1))
+
+    print(f"\n{len(texts)} reviews, {torch.get_num_threads()} threads"
+          + (" (random weights, informational only)" if BENCH_RANDOM_WEIGHTS else ""))
+    print(f"  fake probability  max |dp| {prob_diff.max():.2e}")
+    print(f"  sentiment         labels flipped {label_flips:.2%}, "
+          f"max |d score| {score_diff.max():.4f}, mean {score_diff.mean():.4f}")
+    print(f"  CPU time          two models {ref_cpu:.2f} s, shared encoder {cpu:.2f} s ({ref_cpu / cpu:.2f}x)")
+
+    # The fake head must see exactly what it saw before; sentiment is a distilled head, so only flag drift
+    if prob_diff.max() > 1e-4:
+        print("\nFake probabilities changed in shared-encoder mode")
+        return 1
+    if label_flips > PARITY_MAX_FLIP_RATE:
+        print(f"\nSentiment labels flipped above {PARITY_MAX_FLIP_RATE:.0%}; fit the head on more reviews")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
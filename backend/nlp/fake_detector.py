@@ -1,21 +1,22 @@
 # backend/nlp/fake_detector.py
 import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
 import numpy as np
-import pickle
 import re
 import os
 
-# Load DistilBERT
-distilbert_tokenizer = AutoTokenizer.from_pretrained(r"D:\Coding Workspaces\RepuTrack\backend\nlp\distilbert_fake_review")
-distilbert_model = AutoModelForSequenceClassification.from_pretrained(r"D:\Coding Workspaces\RepuTrack\backend\nlp\distilbert_fake_review")
-distilbert_model.eval()
+from .model_registry import (
+    models, DISTILBERT_PATH, WORD_INDEX_PATH, WORD_TO_IDX_PATH, BILSTM_WEIGHTS_PATH, BILSTM_PACKED, BILSTM_JIT,
+)
+from .backends import NLP_BACKEND, make_classifier, classify, softmax
+from .inference_cache import NLP_MODEL_VERSION
+from .vocab import load_word_index
+
 
-# Load BiLSTM
 class BiLSTM(torch.nn.Module):
     def __init__(self, embedding_matrix, hidden_dim=128, num_layers=2):
         super().__init__()
-        self.embedding = torch.nn.Embedding.from_pretrained(torch.FloatTensor(embedding_matrix), padding_idx=0)
+        self.embedding = torch.nn.Embedding.from_pretrained(torch.as_tensor(embedding_matrix, dtype=torch.float32), padding_idx=0)
         self.lstm = torch.nn.LSTM(300, hidden_dim, num_layers, bidirectional=True, batch_first=True, dropout=0.5)
         self.fc = torch.nn.Linear(hidden_dim * 2, 2)
         self.dropout = torch.nn.Dropout(0.5)
@@ -26,47 +27,178 @@ class BiLSTM(torch.nn.Module):
         out = self.dropout(lstm_out[:, -1, :])
         return self.fc(out)
 
-# Load embedding matrix & word_to_idx
-embedding_matrix = np.load(r"D:\Coding Workspaces\RepuTrack\backend\nlp\embedding_matrix.npy")
-with open(r"D:\Coding Workspaces\RepuTrack\backend\nlp\word_to_idx.pkl", "rb") as f:
-    word_to_idx = pickle.load(f)
 
-bilstm_model = BiLSTM(embedding_matrix)
-bilstm_model.load_state_dict(torch.load(r"D:\Coding Workspaces\RepuTrack\backend\nlp\bilstm_fake_review.pth", map_location="cpu"))
-bilstm_model.eval()
+class PackedBiLSTM(torch.nn.Module):
+    """
+    Inference over true lengths: the LSTM never steps through padding, and each review is
+    read at its last real word rather than at step 99. Shares the BiLSTM's parameters.
+    Identical to BiLSTM for reviews of BILSTM_MAX_LEN words or more; shorter ones differ,
+    since BiLSTM's step-99 output is what it computed after the padding.
+    """
 
-def predict_fake_ensemble(reviews):
-    if not reviews:
-        return reviews, 0.0
+    def __init__(self, model):
+        super().__init__()
+        self.embedding = model.embedding
+        self.lstm = model.lstm
+        self.fc = model.fc
+
+    def forward(self, x, lengths):
+        packed = pack_padded_sequence(self.embedding(x), lengths, batch_first=True, enforce_sorted=False)
+        lstm_out, _ = self.lstm(packed)
+        lstm_out, _ = pad_packed_sequence(lstm_out, batch_first=True)
+        return self.fc(lstm_out[torch.arange(lstm_out.shape[0]), lengths - 1])
+
+
+def load_distilbert(backend=NLP_BACKEND):
+    """(tokenizer, classifier) on the configured inference backend"""
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    def load_model(**kwargs):
+        return AutoModelForSequenceClassification.from_pretrained(DISTILBERT_PATH, **kwargs)
+
+    tokenizer = AutoTokenizer.from_pretrained(DISTILBERT_PATH)
+    return tokenizer, make_classifier(load_model, backend, "distilbert", NLP_MODEL_VERSION)
+
+
+def load_checkpoint(path):
+    """State dict backed by the file's pages (mmap), falling back to a normal load for legacy pickles"""
+    try:
+        return torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    except RuntimeError as e:
+        print(f"[MODELS] {path} can't be memory-mapped ({e}), loading it into RAM")
+        return torch.load(path, map_location="cpu", weights_only=True)
+
+
+def load_bilstm(weights_path=BILSTM_WEIGHTS_PATH, word_index_path=WORD_INDEX_PATH, word_to_idx_path=WORD_TO_IDX_PATH):
+    """(word_index, model): the vocabulary only matters to the BiLSTM"""
+    word_index = load_word_index(word_index_path, word_to_idx_path)
+
+    # The checkpoint already holds the embedding (it used to overwrite the one built from
+    # embedding_matrix.npy), so the model is built on the meta device without allocating
+    # and takes the mmapped checkpoint tensors as its parameters: forked workers read
+    # the same page-cache pages instead of each holding a private copy
+    state = load_checkpoint(weights_path)
+    with torch.device("meta"):
+        model = BiLSTM(torch.empty(state["embedding.weight"].shape))
+    model.load_state_dict(state, assign=True)
+    model.eval()
+    return word_index, model
+
+
+def load_packed_bilstm(jit=BILSTM_JIT):
+    """PackedBiLSTM on the loaded BiLSTM's parameters, TorchScripted unless jit is off"""
+    _, model = models.get("bilstm")
+    packed = PackedBiLSTM(model).eval()
+    if jit:
+        try:
+            return torch.jit.script(packed)
+        except Exception as e:
+            print(f"[MODELS] TorchScript failed for the packed BiLSTM, running it eagerly: {e}")
+    return packed
+
+
+models.register("distilbert", load_distilbert)
+models.register("bilstm", load_bilstm)
+models.register("bilstm_packed", load_packed_bilstm)
+
+
+def clean_text(text):
+    return re.sub(r'[^a-z\s]', '', text.lower())
 
-    texts = [re.sub(r'[^a-z\s]', '', r["text"].lower()) for r in reviews]
 
-    # DistilBERT
-    inputs = distilbert_tokenizer(texts, padding=True, truncation=True, max_length=256, return_tensors="pt")
+# Reviews per DistilBERT forward pass after sorting by length
+FAKE_BUCKET_SIZE = int(os.getenv("FAKE_BUCKET_SIZE", "16"))
+BILSTM_MAX_LEN = 100
+# Reviews per packed BiLSTM pass after sorting by word count
+BILSTM_BUCKET_SIZE = int(os.getenv("BILSTM_BUCKET_SIZE", "64"))
+
+
+def distilbert_fake_probs(texts, bucket_size=FAKE_BUCKET_SIZE):
+    """
+    DistilBERT fake probability, run bucket by bucket over length-sorted texts
+    so each bucket is only padded to its own longest review.
+    """
+    tokenizer, classifier = models.get("distilbert")
+    return classify(tokenizer, classifier, texts, max_length=256, bucket_size=bucket_size)[:, 1]
+
+
+def bilstm_words(texts, max_len=BILSTM_MAX_LEN):
+    """(word indices padded to max_len, word counts), built with one flat lookup and a mask scatter"""
+    word_index, _ = models.get("bilstm")
+    words = [text.split()[:max_len] for text in texts]
+    lengths = np.fromiter((len(w) for w in words), dtype=np.int64, count=len(words))
+    flat = word_index.lookup([w for ws in words for w in ws])
+    indices = np.zeros((len(texts), max_len), dtype=np.int64)
+    indices[np.arange(max_len) < lengths[:, None]] = flat
+    return indices, lengths
+
+
+def bilstm_indices(texts, max_len=BILSTM_MAX_LEN):
+    return torch.from_numpy(bilstm_words(texts, max_len)[0])
+
+
+def bilstm_fake_probs(texts, packed=BILSTM_PACKED):
+    if packed:
+        return packed_bilstm_fake_probs(texts)
+    _, bilstm_model = models.get("bilstm")
     with torch.no_grad():
-        d_outputs = distilbert_model(**inputs)
-        d_probs = torch.softmax(d_outputs.logits, dim=1)[:, 1].numpy()
-
-    # BiLSTM
-    indices = []
-    for text in texts:
-        words = text.split()[:100]
-        idxs = [word_to_idx.get(w, 1) for w in words] + [0] * (100 - len(words))
-        indices.append(idxs)
-    indices = torch.tensor(indices)
+        b_outputs = bilstm_model(bilstm_indices(texts))
+        return torch.softmax(b_outputs, dim=1)[:, 1].numpy()
+
+
+def packed_bilstm_fake_probs(texts, bucket_size=BILSTM_BUCKET_SIZE, model=None):
+    """
+    BiLSTM fake probability over true lengths, bucket by bucket over texts sorted by word
+    count, so each bucket is cut to its own longest review. Empty reviews are read as one
+    padding word (pack_padded_sequence needs a length of at least 1).
+    """
+    model = model or models.get("bilstm_packed")
+    indices, lengths = bilstm_words(texts)
+    lengths = np.maximum(lengths, 1)
+    order = np.argsort(lengths, kind="stable")
+
+    probs = np.empty(len(texts), dtype=np.float32)
     with torch.no_grad():
-        b_outputs = bilstm_model(indices)
-        b_probs = torch.softmax(b_outputs, dim=1)[:, 1].numpy()
+        for start in range(0, len(order), bucket_size):
+            bucket = order[start:start + bucket_size]
+            bucket_lengths = lengths[bucket]
+            x = torch.from_numpy(indices[bucket, :bucket_lengths.max()])
+            # Scatter back to the original order
+            probs[bucket] = softmax(model(x, torch.from_numpy(bucket_lengths)).numpy())[:, 1]
+    return probs
+
+
+def score_fake_probabilities(texts):
+    """
+    Ensemble fake probability for already-cleaned texts: DistilBERT runs once per
+    length bucket of FAKE_BUCKET_SIZE texts; the BiLSTM once over all of them, or once
+    per BILSTM_BUCKET_SIZE bucket on the packed path.
+    Returns: np.ndarray of shape (len(texts),)
+    """
+    d_probs = distilbert_fake_probs(texts)
+    b_probs = bilstm_fake_probs(texts)
 
     # Ensemble
-    final_probs = (d_probs + b_probs) / 2
+    return (d_probs + b_probs) / 2
+
+
+def apply_fake_probabilities(reviews, probs):
+    """Write is_fake/fake_probability onto reviews and return the fake ratio"""
     fake_count = 0
-    for i, prob in enumerate(final_probs):
+    for i, prob in enumerate(probs):
         is_fake = prob > 0.5
         reviews[i]["is_fake"] = bool(is_fake)
         reviews[i]["fake_probability"] = round(float(prob), 3)
         if is_fake:
             fake_count += 1
 
-    fake_ratio = round(fake_count / len(reviews), 3)
-    return reviews, fake_ratio
\ No newline at end of file
+    return round(fake_count / len(reviews), 3)
+
+
+def predict_fake_ensemble(reviews):
+    if not reviews:
+        return reviews, 0.0
+
+    probs = score_fake_probabilities([clean_text(r["text"]) for r in reviews])
+    fake_ratio = apply_fake_probabilities(reviews, probs)
+    return reviews, fake_ratio
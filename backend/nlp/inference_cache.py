@@ -0,0 +1,192 @@
+# backend/nlp/inference_cache.py
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import re
+import os
+
+from .model_registry import NLP_BACKEND, NLP_SHARED_ENCODER, BILSTM_PACKED
+
+# Bump to invalidate every cached prediction after retraining or swapping a model
+NLP_MODEL_VERSION = os.getenv("NLP_MODEL_VERSION", "1")
+# int8/ONNX, the shared-encoder sentiment head and the packed BiLSTM are close to the
+# fp32 two-model predictions but not identical, so each of them caches under its own keys
+CACHE_MODEL_VERSION = "-".join(
+    [NLP_MODEL_VERSION] + ([NLP_BACKEND] if NLP_BACKEND != "torch" else [])
+    + (["shared"] if NLP_SHARED_ENCODER else []) + (["packed"] if BILSTM_PACKED else [])
+)
+NLP_CACHE_LRU_SIZE = int(os.getenv("NLP_CACHE_LRU_SIZE", "20000"))
+NLP_CACHE_TTL = int(os.getenv("NLP_CACHE_TTL", str(90 * 24 * 3600)))  # seconds, Redis only
+
+CACHED_FIELDS = ("fake_probability", "is_fake", "sentiment", "sentiment_score")
+
+
+def normalize_review_text(text):
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def review_hash(text):
+    """Content hash of the normalized review text"""
+    return hashlib.sha256(normalize_review_text(text).encode("utf-8")).hexdigest()
+
+
+class InferenceCache:
+    """
+    Prediction cache keyed by review hash + model version.
+    A bounded in-process LRU sits in front of Redis; Redis is optional and any
+    Redis error just degrades to the LRU.
+    """
+
+    def __init__(self, redis_url=None, lru_size=NLP_CACHE_LRU_SIZE, ttl=NLP_CACHE_TTL,
+                 model_version=CACHE_MODEL_VERSION):
+        self.lru_size = lru_size
+        self.ttl = ttl
+        self.model_version = model_version
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self.metrics = {"lru_hits": 0, "redis_hits": 0, "misses": 0}
+
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=2)
+            except Exception as e:
+                print(f"[CACHE] Redis unavailable, using in-process cache only: {e}")
+
+    def _key(self, content_hash):
+        return f"reputrack:nlp:v{self.model_version}:{content_hash}"
+
+    def _lru_put(self, key, value):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get_many(self, hashes):
+        """Returns {hash: cached fields} for the hashes that are cached"""
+        found, remote = {}, []
+        with self._lock:
+            for h in hashes:
+                key = self._key(h)
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[h] = self._lru[key]
+                    self.metrics["lru_hits"] += 1
+                else:
+                    remote.append(h)
+
+        if remote and self._redis is not None:
+            try:
+                values = self._redis.mget([self._key(h) for h in remote])
+            except Exception as e:
+                print(f"[CACHE] Redis read failed: {e}")
+                values = [None] * len(remote)
+            with self._lock:
+                for h, raw in zip(remote, values):
+                    if raw is not None:
+                        found[h] = json.loads(raw)
+                        self._lru_put(self._key(h), found[h])
+                        self.metrics["redis_hits"] += 1
+
+        with self._lock:
+            self.metrics["misses"] += len(hashes) - len(found)
+        return found
+
+    def set_many(self, items):
+        """items: {hash: review dict with the CACHED_FIELDS set}"""
+        if not items:
+            return
+        values = {h: {f: review[f] for f in CACHED_FIELDS} for h, review in items.items()}
+        with self._lock:
+            for h, value in values.items():
+                self._lru_put(self._key(h), value)
+
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for h, value in values.items():
+                    pipe.set(self._key(h), json.dumps(value), ex=self.ttl)
+                pipe.execute()
+            except Exception as e:
+                print(f"[CACHE] Redis write failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            hits = self.metrics["lru_hits"] + self.metrics["redis_hits"]
+            total = hits + self.metrics["misses"]
+            return {
+                **self.metrics,
+                "lru_entries": len(self._lru),
+                "hit_rate": round(hits / total, 3) if total else 0.0,
+                "model_version": self.model_version,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_inference_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = InferenceCache(redis_url=os.getenv("REDIS_URL"))
+        return _cache
+
+
+def analyze_reviews_cached(review_lists):
+    """
+    Fake detection + sentiment for several links' reviews, sending only cache misses to the models.
+    Returns: one (reviews, fake_ratio, sentiment_score, sentiment_breakdown) per input list
+    """
+    # Deferred so importing this module never loads the models
+    from .batching import get_fake_batcher, FAKE_BATCH_RESULT_TIMEOUT
+    from .sentiment_analyzer import analyze_sentiment, summarize_sentiment
+
+    cache = get_inference_cache()
+    hashes = [[review_hash(r["text"]) for r in reviews] for reviews in review_lists]
+    cached = cache.get_many(list({h for link_hashes in hashes for h in link_hashes}))
+
+    # Fill hits, collect misses per link (one copy per unique text)
+    misses = []
+    for reviews, link_hashes in zip(review_lists, hashes):
+        link_misses, seen = [], set()
+        for review, h in zip(reviews, link_hashes):
+            if h in cached:
+                review.update(cached[h])
+            elif h not in seen:
+                seen.add(h)
+                link_misses.append(review)
+        misses.append(link_misses)
+
+    all_misses = [r for link_misses in misses for r in link_misses]
+    if NLP_SHARED_ENCODER:
+        # Fake detection and sentiment from one DistilBERT pass over all misses
+        from .multi_head import predict_fake_and_sentiment
+        predict_fake_and_sentiment(all_misses)
+    else:
+        # 1. Fake review detection, batched across links
+        batcher = get_fake_batcher()
+        futures = [batcher.submit(link_misses) for link_misses in misses]
+        for future in futures:
+            future.result(timeout=FAKE_BATCH_RESULT_TIMEOUT)
+
+        # 2. Sentiment analysis in one pipeline call
+        analyze_sentiment(all_misses)
+    cache.set_many({review_hash(r["text"]): r for r in all_misses})
+
+    # Duplicate texts within a link reuse the first copy's prediction
+    results = []
+    for reviews, link_hashes in zip(review_lists, hashes):
+        scored = {h: r for r, h in zip(reviews, link_hashes) if "is_fake" in r}
+        for review, h in zip(reviews, link_hashes):
+            if "is_fake" not in review:
+                review.update({f: scored[h][f] for f in CACHED_FIELDS})
+
+        fake_ratio = round(sum(r["is_fake"] for r in reviews) / len(reviews), 3) if reviews else 0.0
+        sentiment_score, sentiment_breakdown = summarize_sentiment(reviews)
+        results.append((reviews, fake_ratio, sentiment_score, sentiment_breakdown))
+
+    return results
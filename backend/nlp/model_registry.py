@@ -0,0 +1,111 @@
+# backend/nlp/model_registry.py
+# One lazily loaded copy of each NLP model per process. Importing the NLP modules
+# loads nothing; the first call that needs a model pays its load, once.
+import threading
+import time
+import sys
+import os
+
+NLP_MODEL_DIR = os.getenv("NLP_MODEL_DIR", os.path.dirname(os.path.abspath(__file__)))
+DISTILBERT_PATH = os.getenv("DISTILBERT_PATH", os.path.join(NLP_MODEL_DIR, "distilbert_fake_review"))
+WORD_INDEX_PATH = os.getenv("WORD_INDEX_PATH", os.path.join(NLP_MODEL_DIR, "word_index.npy"))
+# Pickled dict the word index is built from (python -m backend.nlp.vocab)
+WORD_TO_IDX_PATH = os.getenv("WORD_TO_IDX_PATH", os.path.join(NLP_MODEL_DIR, "word_to_idx.pkl"))
+BILSTM_WEIGHTS_PATH = os.getenv("BILSTM_WEIGHTS_PATH", os.path.join(NLP_MODEL_DIR, "bilstm_fake_review.pth"))
+# Hub id or local directory
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "distilbert-base-uncased-finetuned-sst-2-english")
+# DistilBERT inference backend: torch (fp32), int8 (dynamic quantization) or onnx (ONNX Runtime)
+NLP_BACKEND = os.getenv("NLP_BACKEND", "torch")
+NLP_ONNX_DIR = os.getenv("NLP_ONNX_DIR", os.path.join(NLP_MODEL_DIR, "onnx"))
+# One DistilBERT pass for both fake detection and sentiment (see multi_head.py)
+NLP_SHARED_ENCODER = os.getenv("NLP_SHARED_ENCODER", "false").lower() == "true"
+SENTIMENT_HEAD_PATH = os.getenv("SENTIMENT_HEAD_PATH", os.path.join(NLP_MODEL_DIR, "sentiment_head.pt"))
+# BiLSTM over each review's real words only, read at its last word (see fake_detector.PackedBiLSTM)
+BILSTM_PACKED = os.getenv("BILSTM_PACKED", "false").lower() == "true"
+BILSTM_JIT = os.getenv("BILSTM_JIT", "true").lower() == "true"  # TorchScript the packed path
+# PyTorch intra-op threads per process; 0 keeps torch's default (every core). With N
+# inference worker processes on C cores, C // N keeps them from oversubscribing the CPU
+NLP_TORCH_THREADS = int(os.getenv("NLP_TORCH_THREADS", "0"))
+
+
+def rss_bytes():
+    """Current resident set size; peak RSS on macOS, 0 where neither is available (Windows)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def configure_torch_threads(threads=NLP_TORCH_THREADS):
+    if threads <= 0:
+        return
+    import torch
+    if torch.get_num_threads() != threads:
+        torch.set_num_threads(threads)
+        print(f"[MODELS] PyTorch set to {threads} threads in process {os.getpid()}")
+
+
+class ModelRegistry:
+    """
+    name -> loader, called on the first get(name). Loads are serialized per model,
+    so concurrent first callers wait for one load instead of each loading a copy.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._locks = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._locks[name]:
+            if name not in self._models:
+                # Once per worker process, before its first model runs
+                configure_torch_threads()
+                rss_before, start = rss_bytes(), time.perf_counter()
+                self._models[name] = self._loaders[name]()
+                self._stats[name] = {
+                    "load_seconds": round(time.perf_counter() - start, 2),
+                    "rss_delta_mb": round((rss_bytes() - rss_before) / 2**20, 1),
+                    "rss_after_mb": round(rss_bytes() / 2**20, 1),
+                }
+                s = self._stats[name]
+                print(f"[MODELS] Loaded {name} in {s['load_seconds']} s, "
+                      f"+{s['rss_delta_mb']} MB RSS ({s['rss_after_mb']} MB total)")
+            return self._models[name]
+
+    def loaded(self, name):
+        return name in self._models
+
+    def unload(self, name):
+        """Drop a model so the next get() reloads it (e.g. after swapping files on disk)"""
+        with self._locks[name]:
+            self._models.pop(name, None)
+            self._stats.pop(name, None)
+
+    def stats(self):
+        """Load time and RSS growth per loaded model; models not loaded yet show as None"""
+        return {
+            "rss_mb": round(rss_bytes() / 2**20, 1),
+            "models": {name: self._stats.get(name) for name in self._loaders},
+        }
+
+
+models = ModelRegistry()
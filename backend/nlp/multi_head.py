@@ -0,0 +1,198 @@
+# backend/nlp/multi_head.py
+# Shared-encoder mode (NLP_SHARED_ENCODER=true): one tokenization and one DistilBERT pass
+# per review feed both the fake-review head and a sentiment head.
+# The fake-review model and the SST-2 sentiment model were fine-tuned separately, so
+# their encoders differ and neither head can simply sit on the other's encoder. The
+# fake-review encoder and head are kept as they are (DistilBERT fake probabilities
+# don't change), and a sentiment head with the SST-2 head's layout is distilled onto
+# that encoder from the SST-2 model's predictions on our own reviews.
+# Fit the head: python -m backend.nlp.multi_head [reviews.txt]  (default: reviews in the database)
+import sys
+import os
+
+import torch
+
+from .model_registry import (
+    models, NLP_BACKEND, DISTILBERT_PATH, SENTIMENT_MODEL, SENTIMENT_HEAD_PATH,
+)
+from .backends import TorchClassifier, quantize_int8, run_bucketed, classify
+from .fake_detector import clean_text, bilstm_fake_probs, apply_fake_probabilities, FAKE_BUCKET_SIZE
+
+# The fake-review model's limit: the shared pass must give the fake head exactly the tokens it got before
+SHARED_MAX_LENGTH = 256
+SHARED_HEAD_TRAIN_REVIEWS = int(os.getenv("SHARED_HEAD_TRAIN_REVIEWS", "20000"))
+SHARED_HEAD_EPOCHS = int(os.getenv("SHARED_HEAD_EPOCHS", "20"))
+
+
+class ClassificationHead(torch.nn.Module):
+    """DistilBertForSequenceClassification's head layout: takes either model's head weights as they are"""
+
+    def __init__(self, dim=768, num_labels=2):
+        super().__init__()
+        self.pre_classifier = torch.nn.Linear(dim, dim)
+        self.classifier = torch.nn.Linear(dim, num_labels)
+
+    def forward(self, cls):
+        return self.classifier(torch.relu(self.pre_classifier(cls)))
+
+
+class MultiHeadDistilBert(torch.nn.Module):
+    """Fake-review DistilBERT encoder -> (fake logits, sentiment logits)"""
+
+    def __init__(self, fake_model, sentiment_head):
+        super().__init__()
+        self.encoder = fake_model.distilbert
+        self.fake_head = ClassificationHead(fake_model.config.dim, fake_model.config.num_labels)
+        self.fake_head.load_state_dict({
+            **{f"pre_classifier.{k}": v for k, v in fake_model.pre_classifier.state_dict().items()},
+            **{f"classifier.{k}": v for k, v in fake_model.classifier.state_dict().items()},
+        })
+        self.sentiment_head = sentiment_head
+
+    def forward(self, input_ids, attention_mask):
+        cls = self.encoder(input_ids=input_ids, attention_mask=attention_mask)[0][:, 0]
+        return self.fake_head(cls), self.sentiment_head(cls)
+
+
+class SharedClassifier:
+    def __init__(self, model):
+        self.model = model.eval()
+
+    def __call__(self, input_ids, attention_mask):
+        with torch.no_grad():
+            return tuple(logits.numpy() for logits in self.model(torch.from_numpy(input_ids), torch.from_numpy(attention_mask)))
+
+
+def load_shared_model(backend=NLP_BACKEND):
+    """(tokenizer, classifier, sentiment labels) for the shared pass; torch or int8"""
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    if backend not in ("torch", "int8"):
+        raise ValueError(f"Shared-encoder mode runs on the torch or int8 backend, not '{backend}'")
+    if not os.path.exists(SENTIMENT_HEAD_PATH):
+        raise FileNotFoundError(f"{SENTIMENT_HEAD_PATH} missing, fit it with: python -m backend.nlp.multi_head")
+
+    saved = torch.load(SENTIMENT_HEAD_PATH, map_location="cpu", weights_only=True)
+    fake_model = AutoModelForSequenceClassification.from_pretrained(DISTILBERT_PATH)
+    head = ClassificationHead(fake_model.config.dim, len(saved["labels"]))
+    head.load_state_dict(saved["state_dict"])
+    model = MultiHeadDistilBert(fake_model, head).eval()
+    if backend == "int8":
+        model = quantize_int8(model)
+    return AutoTokenizer.from_pretrained(DISTILBERT_PATH), SharedClassifier(model), saved["labels"]
+
+
+models.register("shared", load_shared_model)
+
+
+def predict_fake_and_sentiment(reviews, bucket_size=FAKE_BUCKET_SIZE):
+    """
+    Writes the fields predict_fake_ensemble and analyze_sentiment write (is_fake,
+    fake_probability, sentiment, sentiment_score), with one DistilBERT pass per review.
+    """
+    if not reviews:
+        return reviews
+    tokenizer, classifier, labels = models.get("shared")
+    texts = [clean_text(r["text"]) for r in reviews]
+    fake, sentiment = classify(tokenizer, classifier, texts, max_length=SHARED_MAX_LENGTH, bucket_size=bucket_size)
+
+    # Ensemble, as in score_fake_probabilities
+    apply_fake_probabilities(reviews, (fake[:, 1] + bilstm_fake_probs(texts)) / 2)
+    for review, p in zip(reviews, sentiment):
+        best = int(p.argmax())
+        review["sentiment"] = labels[best]
+        review["sentiment_score"] = round(float(p[best]), 3)
+    return reviews
+
+
+def cls_features(tokenizer, fake_model, texts, bucket_size=FAKE_BUCKET_SIZE):
+    """[CLS] vectors of the fake-review encoder for cleaned texts, as the shared pass sees them"""
+    def encode(input_ids, attention_mask):
+        with torch.no_grad():
+            hidden = fake_model.distilbert(input_ids=torch.from_numpy(input_ids),
+                                           attention_mask=torch.from_numpy(attention_mask))[0]
+            return hidden[:, 0].numpy()
+
+    return run_bucketed(tokenizer, [clean_text(t) for t in texts], SHARED_MAX_LENGTH, bucket_size, encode)
+
+
+def fit_head(tokenizer, fake_model, sst_tokenizer, sst_model, texts,
+             epochs=SHARED_HEAD_EPOCHS, holdout=0.1, lr=1e-3, batch_size=64, seed=0):
+    """
+    Distill the SST-2 model (on raw text, as analyze_sentiment runs it) into a head on the
+    fake-review encoder's [CLS] vector. Returns (head, holdout label agreement).
+    """
+    fake_model.eval()
+    sst_model.eval()
+    targets = torch.from_numpy(classify(sst_tokenizer, TorchClassifier(sst_model), texts, max_length=512, bucket_size=16))
+    features = torch.from_numpy(cls_features(tokenizer, fake_model, texts))
+
+    head = ClassificationHead(features.shape[1], targets.shape[1])
+    head.pre_classifier.load_state_dict(sst_model.pre_classifier.state_dict())
+    head.classifier.load_state_dict(sst_model.classifier.state_dict())
+
+    generator = torch.Generator().manual_seed(seed)
+    order = torch.randperm(len(texts), generator=generator)
+    n_holdout = max(1, int(len(texts) * holdout))
+    held, train = order[:n_holdout], order[n_holdout:]
+
+    optimizer = torch.optim.Adam(head.parameters(), lr=lr)
+    for _ in range(epochs):
+        for batch in train[torch.randperm(len(train), generator=generator)].split(batch_size):
+            loss = torch.nn.functional.kl_div(
+                torch.log_softmax(head(features[batch]), dim=1), targets[batch], reduction="batchmean"
+            )
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+
+    with torch.no_grad():
+        agreement = (head(features[held]).argmax(dim=1) == targets[held].argmax(dim=1)).float().mean().item()
+    return head.eval(), agreement
+
+
+def save_head(head, labels, agreement, path=SENTIMENT_HEAD_PATH):
+    torch.save({"state_dict": head.state_dict(), "labels": labels, "holdout_agreement": agreement}, path)
+
+
+def training_texts(path=None, limit=SHARED_HEAD_TRAIN_REVIEWS):
+    """Distinct review texts: one per line from a file, else the most recently seen in the database"""
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return list(dict.fromkeys(line.strip() for line in f if line.strip()))[:limit]
+
+    from sqlalchemy import select, func
+    from ..app.database import SessionLocal
+    from ..app.models import Review
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(Review.text).group_by(Review.text).order_by(func.max(Review.last_seen).desc()).limit(limit)
+        ).scalars().all()
+        return list(rows)
+    finally:
+        db.close()
+
+
+def main():
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    texts = training_texts(sys.argv[1] if len(sys.argv) > 1 else None)
+    if len(texts) < 500:
+        print(f"Only {len(texts)} reviews to fit on; the head will be rough")
+    print(f"Fitting the sentiment head on {len(texts)} reviews...")
+
+    sst_model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL)
+    head, agreement = fit_head(
+        AutoTokenizer.from_pretrained(DISTILBERT_PATH), AutoModelForSequenceClassification.from_pretrained(DISTILBERT_PATH),
+        AutoTokenizer.from_pretrained(SENTIMENT_MODEL), sst_model, texts,
+    )
+    labels = [sst_model.config.id2label[i] for i in range(sst_model.config.num_labels)]
+    save_head(head, labels, agreement)
+    print(f"Saved {SENTIMENT_HEAD_PATH}: holdout label agreement with the SST-2 model {agreement:.2%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,30 @@
 # backend/nlp/sentiment_analyzer.py
-from transformers import pipeline
-import torch
+import os
 
-# Load sentiment analysis model (using a lightweight model)
-sentiment_analyzer = pipeline(
-    "sentiment-analysis",
-    model="distilbert-base-uncased-finetuned-sst-2-english",
-    device=0 if torch.cuda.is_available() else -1
-)
+from .model_registry import models, SENTIMENT_MODEL, NLP_BACKEND
+
+# Reviews per forward pass after sorting by length
+SENTIMENT_BUCKET_SIZE = int(os.getenv("SENTIMENT_BUCKET_SIZE", "16"))
+
+
+def load_sentiment_model(backend=NLP_BACKEND):
+    """(tokenizer, classifier, labels) on the configured inference backend"""
+    # Deferred so summarize_sentiment callers never import torch or transformers
+    from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
+    from .backends import make_classifier
+    from .inference_cache import NLP_MODEL_VERSION
+
+    # Load sentiment analysis model (using a lightweight model)
+    def load_model(**kwargs):
+        return AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL, **kwargs)
+
+    tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL)
+    config = AutoConfig.from_pretrained(SENTIMENT_MODEL)
+    labels = [config.id2label[i] for i in range(config.num_labels)]
+    return tokenizer, make_classifier(load_model, backend, "sentiment", NLP_MODEL_VERSION), labels
+
+
+models.register("sentiment", load_sentiment_model)
 
 def analyze_sentiment(reviews):
     """
@@ -20,19 +37,32 @@ def analyze_sentiment(reviews):
     texts = [r["text"] for r in reviews]
     
     # Batch sentiment analysis
-    sentiments = sentiment_analyzer(texts, truncation=True, max_length=512)
+    from .backends import classify
+    tokenizer, classifier, labels = models.get("sentiment")
+    probs = classify(tokenizer, classifier, texts, max_length=512, bucket_size=SENTIMENT_BUCKET_SIZE)
     
+    for i, p in enumerate(probs):
+        best = int(p.argmax())
+        # Add sentiment to review
+        reviews[i]["sentiment"] = labels[best]  # POSITIVE or NEGATIVE
+        reviews[i]["sentiment_score"] = round(float(p[best]), 3)  # confidence
+    
+    overall_score, sentiment_breakdown = summarize_sentiment(reviews)
+    return reviews, overall_score, sentiment_breakdown
+
+
+def summarize_sentiment(reviews):
+    """
+    Overall score and breakdown from reviews that already carry sentiment fields
+    Returns: (overall_sentiment_score, sentiment_breakdown)
+    """
     positive_count = 0
     negative_count = 0
     neutral_count = 0
     
-    for i, sentiment in enumerate(sentiments):
-        label = sentiment['label']  # POSITIVE or NEGATIVE
-        score = sentiment['score']  # confidence
-        
-        # Add sentiment to review
-        reviews[i]["sentiment"] = label
-        reviews[i]["sentiment_score"] = round(score, 3)
+    for review in reviews:
+        label = review["sentiment"]
+        score = review["sentiment_score"]
         
         # Count sentiments
         if label == "POSITIVE" and score > 0.6:
@@ -52,4 +82,4 @@ def analyze_sentiment(reviews):
         "neutral": neutral_count
     }
     
-    return reviews, overall_score, sentiment_breakdown
\ No newline at end of file
+    return overall_score, sentiment_breakdown
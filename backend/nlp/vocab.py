@@ -0,0 +1,105 @@
+# backend/nlp/vocab.py
+# Compact word -> index table for the BiLSTM: 64-bit word fingerprints, sorted, next
+# to their indices in one .npy. It is memory-mapped, so forked workers share its pages,
+# and a whole batch of words is looked up with a single np.searchsorted.
+# Rebuild after retraining: python -m backend.nlp.vocab
+import hashlib
+import pickle
+import sys
+import os
+
+import numpy as np
+
+from .model_registry import WORD_TO_IDX_PATH, WORD_INDEX_PATH
+
+UNK_INDEX = 1
+
+
+def fingerprint(word):
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def build_word_index(word_to_idx):
+    """(2, n) uint64 table: sorted fingerprints in row 0, the matching indices in row 1"""
+    keys = np.fromiter((fingerprint(w) for w in word_to_idx), dtype=np.uint64, count=len(word_to_idx))
+    ids = np.fromiter(word_to_idx.values(), dtype=np.uint64, count=len(word_to_idx))
+    order = np.argsort(keys, kind="stable")
+    table = np.stack([keys[order], ids[order]])
+    if np.any(table[0][1:] == table[0][:-1]):
+        raise ValueError("Two vocabulary words share a fingerprint")
+    return table
+
+
+def read_word_to_idx(path=WORD_TO_IDX_PATH):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def save_word_index(table, path=WORD_INDEX_PATH):
+    """Write through a temp file so workers starting together never map a partial table"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, table)
+    os.replace(tmp, path)
+
+
+class WordIndex:
+    """Read-only stand-in for the word_to_idx dict"""
+
+    def __init__(self, table):
+        self.keys, self.ids = table[0], table[1]
+
+    @classmethod
+    def load(cls, path=WORD_INDEX_PATH):
+        return cls(np.load(path, mmap_mode="r"))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, words, default=UNK_INDEX):
+        """Indices for a list of words as an int64 array, default for unknown words"""
+        memo = {}
+        fingerprints = np.fromiter(
+            (memo[w] if w in memo else memo.setdefault(w, fingerprint(w)) for w in words),
+            dtype=np.uint64, count=len(words)
+        )
+        pos = np.minimum(np.searchsorted(self.keys, fingerprints), len(self.keys) - 1)
+        found = self.keys[pos] == fingerprints
+        return np.where(found, self.ids[pos], default).astype(np.int64)
+
+    def get(self, word, default=UNK_INDEX):
+        return int(self.lookup([word], default)[0])
+
+
+def load_word_index(path=WORD_INDEX_PATH, source=WORD_TO_IDX_PATH):
+    """Memory-mapped word index, built from the pickled dict on first use if it isn't on disk"""
+    if not os.path.exists(path):
+        print(f"[MODELS] {path} missing, building it from {source}")
+        table = build_word_index(read_word_to_idx(source))
+        try:
+            save_word_index(table, path)
+        except OSError as e:
+            print(f"[MODELS] Could not save the word index, keeping it in memory: {e}")
+            return WordIndex(table)
+    return WordIndex.load(path)
+
+
+def main():
+    word_to_idx = read_word_to_idx()
+    save_word_index(build_word_index(word_to_idx))
+
+    # The saved table must agree with the dict on every word and on unknown ones
+    index = WordIndex.load(WORD_INDEX_PATH)
+    words = list(word_to_idx)
+    if not np.array_equal(index.lookup(words), np.fromiter(word_to_idx.values(), dtype=np.int64)):
+        print("Lookup mismatch against word_to_idx")
+        return 1
+    if index.get("qzxv-not-a-word") != UNK_INDEX:
+        print("Unknown word did not map to <UNK>")
+        return 1
+    print(f"Wrote {WORD_INDEX_PATH}: {len(index)} words, {os.path.getsize(WORD_INDEX_PATH) / 1024:.0f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,140 +1,316 @@
 # backend/scraper/amazon_scraper.py
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+from .browser_pool import get_browser_pool
+from . import parsers
+from playwright.async_api import TimeoutError as AsyncPlaywrightTimeout
+from ..nlp.inference_cache import review_hash
+from urllib.parse import urlparse
+import asyncio
 import time
 import random
+import re
+import os
+
+RATING_SELECTORS = [
+    'span[data-hook="rating-out-of-text"]',
+    'i[data-hook="average-star-rating"] span.a-icon-alt',
+    'span.a-icon-alt'
+]
+# Matches every review's stars too, so it only counts when nothing specific matched
+BROAD_RATING_SELECTORS = ['span.a-icon-alt']
+REVIEWS_SECTION_SELECTOR = 'div[data-hook="reviews-medley-footer"], div#reviewsMedley'
+SEE_ALL_REVIEWS_SELECTOR = 'a[data-hook="see-all-reviews-link-foot"]'
+REVIEW_SELECTOR = '[data-hook="review"]'
+STAR_SELECTOR = '[data-hook="review-star-rating"] span.a-icon-alt, [data-hook="cmps-review-star-rating"] span.a-icon-alt'
+NEXT_PAGE_SELECTOR = 'li.a-last:not(.a-disabled) a'
+
+# Incremental mode: review pages walked (newest first) before giving up on reaching known reviews
+AMAZON_MAX_REVIEW_PAGES = int(os.getenv("AMAZON_MAX_REVIEW_PAGES", "5"))
+ASIN_RE = re.compile(r'/(?:dp|gp/product|product-reviews)/([A-Z0-9]{10})', re.IGNORECASE)
+
+
+def _parse_rating_text(text):
+    """Extract number (e.g., "4.2 out of 5 stars" -> 4.2)"""
+    if 'out of' in text.lower() or 'stars' in text.lower():
+        return float(text.split()[0])
+    return None
+
+
+def _parse_stars(star_text):
+    try:
+        return int(float(star_text.split()[0]))
+    except:
+        return 5
+
+def reviews_page_url(url, page_number):
+    """Most-recent-first review listing for the product's ASIN, or None if the URL has no ASIN"""
+    match = ASIN_RE.search(url)
+    if not match:
+        return None
+    parts = urlparse(url)
+    return (f"{parts.scheme or 'https'}://{parts.netloc}/product-reviews/{match.group(1).upper()}/"
+            f"?sortBy=recent&pageNumber={page_number}")
+
+
+def _take_new_reviews(page_reviews, known_hashes, seen):
+    """
+    Reviews on a newest-first page up to the first one already stored.
+    Returns (new_reviews, reached_known, skipped) where skipped counts the known tail of the page.
+    """
+    new_reviews = []
+    for idx, review in enumerate(page_reviews):
+        h = review_hash(review["text"])
+        if h in known_hashes:
+            return new_reviews, True, len(page_reviews) - idx
+        if h not in seen:
+            seen.add(h)
+            new_reviews.append(review)
+    return new_reviews, False, 0
+
+
+def _extract_page(page):
+    """Rating, reviews and next-page flag in one round trip: page.content() parsed offline"""
+    parsed = parsers.parse_amazon_reviews(page.content())
+    print(f"Extracted {len(parsed['reviews'])} reviews, rating: {parsed['rating']}")
+    return parsed
+
 
 def scrape_amazon_reviews(url: str, headless=True):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=headless,
-            args=['--disable-blink-features=AutomationControlled']
-        )
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080}
-        )
-        
-        # Anti-detection
-        context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-        """)
-        
-        page = context.new_page()
+    # Plain HTTP first (imported here because http_fetcher imports this module)
+    from .http_fetcher import fetch_fast
+    fast = fetch_fast(url, "amazon")
+    if fast is not None:
+        return fast
 
+    with get_browser_pool(headless).page() as page:
         try:
-            print(f"Navigating to: {url}")
-            
-            # FIX 1: Remove networkidle - use domcontentloaded only
-            page.goto(url, timeout=60000, wait_until='domcontentloaded')
-            time.sleep(random.uniform(2, 4))  # Let page settle
-            
-            print("Page loaded, extracting data...")
-            
-            # FIX 2: Extract rating first (it's always visible)
-            rating = None
-            rating_selectors = [
-                'span[data-hook="rating-out-of-text"]',
-                'i[data-hook="average-star-rating"] span.a-icon-alt',
-                'span.a-icon-alt'
-            ]
-            
-            for sel in rating_selectors:
-                try:
-                    el = page.locator(sel).first
-                    if el.count() > 0:
-                        text = el.inner_text(timeout=5000)
-                        print(f"Found rating text: {text}")
-                        # Extract number (e.g., "4.2 out of 5 stars" -> 4.2)
-                        if 'out of' in text.lower():
-                            rating = float(text.split()[0])
-                        elif 'stars' in text.lower():
-                            rating = float(text.split()[0])
-                        break
-                except Exception as e:
-                    print(f"Selector {sel} failed: {e}")
-                    continue
-            
-            print(f"Rating found: {rating}")
-            
-            # FIX 3: Scroll to reviews section first
-            try:
-                reviews_section = page.locator('div[data-hook="reviews-medley-footer"], div#reviewsMedley').first
-                if reviews_section.count() > 0:
-                    reviews_section.scroll_into_view_if_needed(timeout=5000)
-                    time.sleep(2)
-            except:
-                # Scroll manually if section not found
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight * 0.5)")
+            # Lighter review-only page first; the full product page is the fallback
+            if reviews_page_url(url, 1) is not None:
+                result = _walk_review_pages(page, url, set(), max_pages=1)
+                if result["reviews"]:
+                    return {"rating": result["rating"], "reviews": result["reviews"]}
+                print("No reviews on the review page, loading the product page")
+
+            return _scrape_product_page(page, url)
+
+        except Exception as e:
+            print(f"Error occurred: {e}")
+            return {"error": str(e), "rating": None, "reviews": []}
+
+
+def _scrape_product_page(page, url):
+    """Full scrape from the product page (clicking through to "See all reviews" if needed)"""
+    print(f"Navigating to: {url}")
+    
+    # FIX 1: Remove networkidle - use domcontentloaded only
+    page.goto(url, timeout=60000, wait_until='domcontentloaded')
+    time.sleep(random.uniform(2, 4))  # Let page settle
+    
+    # FIX 3: Scroll to reviews section first
+    try:
+        reviews_section = page.locator(REVIEWS_SECTION_SELECTOR).first
+        if reviews_section.count() > 0:
+            reviews_section.scroll_into_view_if_needed(timeout=5000)
+            time.sleep(2)
+    except:
+        # Scroll manually if section not found
+        page.evaluate("window.scrollTo(0, document.body.scrollHeight * 0.5)")
+        time.sleep(2)
+    
+    print("Looking for reviews...")
+    
+    # FIX 4: Check if we need to click "See all reviews"
+    try:
+        # Try to find reviews on current page first
+        page.wait_for_selector(REVIEW_SELECTOR, timeout=10000)
+        print("Reviews found on main page")
+        
+    except PlaywrightTimeout:
+        # If not found, click "See all reviews"
+        print("No reviews on main page, trying 'See more reviews' link")
+        try:
+            see_all_link = page.locator(SEE_ALL_REVIEWS_SELECTOR).first
+            if see_all_link.count() > 0:
+                see_all_link.click()
+                page.wait_for_load_state('domcontentloaded')
                 time.sleep(2)
-            
-            print("Looking for reviews...")
-            
-            # FIX 4: Check if we need to click "See all reviews"
-            reviews = []
-            try:
-                # Try to find reviews on current page first
-                page.wait_for_selector('[data-hook="review"]', timeout=10000)
-                print("Reviews found on main page")
-                
-            except PlaywrightTimeout:
-                # If not found, click "See all reviews"
-                print("No reviews on main page, trying 'See more reviews' link")
-                try:
-                    see_all_link = page.locator('a[data-hook="see-all-reviews-link-foot"]').first
-                    if see_all_link.count() > 0:
-                        see_all_link.click()
-                        page.wait_for_load_state('domcontentloaded')
-                        time.sleep(2)
-                        print("Navigated to reviews page")
-                except Exception as e:
-                    print(f"Could not navigate to reviews page: {e}")
-            
-            # FIX 5: Extract reviews with better error handling
-            try:
-                page.wait_for_selector('[data-hook="review"]', timeout=15000)
-                review_elements = page.locator('[data-hook="review"]').all()
-                print(f"Found {len(review_elements)} review elements")
-                
-                for idx, el in enumerate(review_elements):  # Get first 10
-                    try:
-                        # Get review text
-                        text_el = el.locator('[data-hook="review-body"] span').first
-                        if text_el.count() == 0:
-                            text_el = el.locator('[data-hook="review-body"]').first
-                        
-                        text = text_el.inner_text(timeout=3000).strip()
-                        
-                        # Get star rating
-                        star_el = el.locator('[data-hook="review-star-rating"] span.a-icon-alt, [data-hook="cmps-review-star-rating"] span.a-icon-alt').first
-                        stars = 5  # Default
-                        
-                        if star_el.count() > 0:
-                            star_text = star_el.inner_text(timeout=3000)
-                            try:
-                                stars = int(float(star_text.split()[0]))
-                            except:
-                                stars = 5
-                        
-                        if len(text) > 0:  # Valid review
-                            reviews.append({"text": text, "stars": stars})
-                            print(f"Extracted review {idx + 1}: {stars} stars, {len(text)} chars")
-                    
-                    except Exception as e:
-                        print(f"Error extracting review {idx + 1}: {e}")
-                        continue
-            
-            except PlaywrightTimeout:
-                print("No reviews found after waiting")
-            
-            browser.close()
-            
-            result = {"rating": rating, "reviews": reviews}
-            print(f"\nFinal result: {len(reviews)} reviews, rating: {rating}")
-            return result
+                print("Navigated to reviews page")
+        except Exception as e:
+            print(f"Could not navigate to reviews page: {e}")
+    
+    # FIX 5: Extract rating and reviews from the final page in one pass
+    try:
+        page.wait_for_selector(REVIEW_SELECTOR, timeout=15000)
+    except PlaywrightTimeout:
+        print("No reviews found after waiting")
+    
+    parsed = _extract_page(page)
+    rating, reviews = parsed["rating"], parsed["reviews"]
+    result = {"rating": rating, "reviews": reviews}
+    print(f"\nFinal result: {len(reviews)} reviews, rating: {rating}")
+    return result
+
+
+def _walk_review_pages(page, url, known_hashes, max_pages):
+    """
+    Incremental mode: read the newest-first review pages until a stored review
+    (by content hash) is reached, the last page ends, or max_pages is hit.
+    """
+    rating, new_reviews, seen, pages, skipped = None, [], set(), 0, 0
+
+    for page_number in range(1, max_pages + 1):
+        print(f"Navigating to review page {page_number}: {url}")
+        response = page.goto(reviews_page_url(url, page_number), timeout=60000, wait_until='domcontentloaded')
+        if response is not None and not response.ok:
+            print(f"Review page answered {response.status}")
+            break
+        time.sleep(random.uniform(1, 2))  # Let page settle
+
+        try:
+            page.wait_for_selector(REVIEW_SELECTOR, timeout=10000)
+        except PlaywrightTimeout:
+            print("No reviews on this page")
+            break
 
+        parsed = _extract_page(page)
+        if page_number == 1:
+            rating = parsed["rating"]
+        pages += 1
+        page_new, reached_known, skipped = _take_new_reviews(parsed["reviews"], known_hashes, seen)
+        new_reviews.extend(page_new)
+        if reached_known:
+            print(f"Reached already-stored reviews on page {page_number}")
+            break
+        if not parsed["has_next"]:
+            break
+
+    print(f"\nFinal result: {len(new_reviews)} new reviews from {pages} pages ({skipped} known skipped), rating: {rating}")
+    return {"rating": rating, "reviews": new_reviews, "incremental": True, "pages": pages, "skipped": skipped}
+
+
+def _incremental_on_page(page, url, known_hashes, max_pages):
+    """
+    _walk_review_pages, falling back to the full product-page scrape when no review page
+    loaded at all (error status, or a sign-in wall where the review list never appears)
+    """
+    result = _walk_review_pages(page, url, known_hashes, max_pages)
+    if result["pages"]:
+        return result
+    print("Review pages didn't load, scraping the product page instead")
+    return _scrape_product_page(page, url)
+
+
+def scrape_amazon_reviews_incremental(url: str, known_hashes, headless=True, max_pages=AMAZON_MAX_REVIEW_PAGES):
+    """
+    Only the reviews newer than the ones already stored for the link.
+    Falls back to a full single-page scrape when the URL has no ASIN to build review page URLs from.
+    """
+    if reviews_page_url(url, 1) is None:
+        return scrape_amazon_reviews(url, headless)
+
+    from .http_fetcher import fetch_fast
+    fast = fetch_fast(url, "amazon", known_hashes, max_pages)
+    if fast is not None:
+        return fast
+
+    with get_browser_pool(headless).page() as page:
+        try:
+            return _incremental_on_page(page, url, known_hashes, max_pages)
         except Exception as e:
             print(f"Error occurred: {e}")
-            browser.close()
-            return {"error": str(e), "rating": None, "reviews": []}
\ No newline at end of file
+            return {"error": str(e), "rating": None, "reviews": []}
+
+
+async def _extract_page_async(page):
+    """asyncio version of _extract_page"""
+    return parsers.parse_amazon_reviews(await page.content())
+
+
+async def _walk_review_pages_async(page, url, known_hashes, max_pages):
+    """asyncio port of _walk_review_pages"""
+    rating, new_reviews, seen, pages, skipped = None, [], set(), 0, 0
+
+    for page_number in range(1, max_pages + 1):
+        response = await page.goto(reviews_page_url(url, page_number), timeout=60000, wait_until='domcontentloaded')
+        if response is not None and not response.ok:
+            break
+        await asyncio.sleep(random.uniform(1, 2))
+
+        try:
+            await page.wait_for_selector(REVIEW_SELECTOR, timeout=10000)
+        except AsyncPlaywrightTimeout:
+            break
+
+        parsed = await _extract_page_async(page)
+        if page_number == 1:
+            rating = parsed["rating"]
+        pages += 1
+        page_new, reached_known, skipped = _take_new_reviews(parsed["reviews"], known_hashes, seen)
+        new_reviews.extend(page_new)
+        if reached_known or not parsed["has_next"]:
+            break
+
+    print(f"Final result: {len(new_reviews)} new reviews from {pages} pages ({skipped} known skipped), "
+          f"rating: {rating} ({url})")
+    return {"rating": rating, "reviews": new_reviews, "incremental": True, "pages": pages, "skipped": skipped}
+
+
+async def scrape_amazon_reviews_async(page, url: str, known_hashes=None, max_pages=AMAZON_MAX_REVIEW_PAGES):
+    """
+    asyncio port of scrape_amazon_reviews for the async engine.
+    The caller owns the page (and its politeness delay), so only short settle waits happen here.
+    Passing known_hashes switches to incremental mode (see scrape_amazon_reviews_incremental).
+    """
+    try:
+        if reviews_page_url(url, 1) is not None:
+            if known_hashes is not None:
+                result = await _walk_review_pages_async(page, url, known_hashes, max_pages)
+                if result["pages"]:
+                    return result
+                # Same fallback as _incremental_on_page
+                print(f"Review pages didn't load, scraping the product page instead ({url})")
+            else:
+                # Lighter review-only page first; the full product page is the fallback
+                result = await _walk_review_pages_async(page, url, set(), max_pages=1)
+                if result["reviews"]:
+                    return {"rating": result["rating"], "reviews": result["reviews"]}
+
+        print(f"Navigating to: {url}")
+        await page.goto(url, timeout=60000, wait_until='domcontentloaded')
+        await asyncio.sleep(random.uniform(1, 2))  # Let page settle
+
+        try:
+            reviews_section = page.locator(REVIEWS_SECTION_SELECTOR).first
+            if await reviews_section.count() > 0:
+                await reviews_section.scroll_into_view_if_needed(timeout=5000)
+                await asyncio.sleep(1)
+        except:
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight * 0.5)")
+            await asyncio.sleep(1)
+
+        try:
+            await page.wait_for_selector(REVIEW_SELECTOR, timeout=10000)
+        except AsyncPlaywrightTimeout:
+            try:
+                see_all_link = page.locator(SEE_ALL_REVIEWS_SELECTOR).first
+                if await see_all_link.count() > 0:
+                    await see_all_link.click()
+                    await page.wait_for_load_state('domcontentloaded')
+                    await asyncio.sleep(1)
+            except Exception as e:
+                print(f"Could not navigate to reviews page: {e}")
+
+        try:
+            await page.wait_for_selector(REVIEW_SELECTOR, timeout=15000)
+        except AsyncPlaywrightTimeout:
+            print("No reviews found after waiting")
+
+        parsed = await _extract_page_async(page)
+        rating, reviews = parsed["rating"], parsed["reviews"]
+
+        print(f"Final result: {len(reviews)} reviews, rating: {rating} ({url})")
+        return {"rating": rating, "reviews": reviews}
+
+    except Exception as e:
+        print(f"Error occurred: {e}")
+        return {"error": str(e), "rating": None, "reviews": []}
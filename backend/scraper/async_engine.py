@@ -0,0 +1,188 @@
+# backend/scraper/async_engine.py
+from playwright.async_api import async_playwright
+from urllib.parse import urlparse
+from collections import defaultdict
+import asyncio
+import random
+import time
+import os
+
+from .browser_pool import USER_AGENT, VIEWPORT, LAUNCH_ARGS, ANTI_DETECTION_SCRIPT
+from .network import track_page_async
+from .http_fetcher import new_async_http_client, fetch_fast_async, tier_stats
+from .amazon_scraper import scrape_amazon_reviews_async
+from .selector_registry import synced_selector_stats
+
+# Engine sizing
+SCRAPER_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "8"))
+SCRAPER_DOMAIN_CONCURRENCY = int(os.getenv("SCRAPER_DOMAIN_CONCURRENCY", "2"))
+SCRAPER_QUEUE_SIZE = int(os.getenv("SCRAPER_QUEUE_SIZE", "100"))
+SCRAPER_POLITENESS_MIN = float(os.getenv("SCRAPER_POLITENESS_MIN", "2"))
+SCRAPER_POLITENESS_MAX = float(os.getenv("SCRAPER_POLITENESS_MAX", "4"))
+
+# platform -> async scraper taking (page, url, **job options)
+ASYNC_SCRAPERS = {
+    "amazon": scrape_amazon_reviews_async,
+}
+
+
+def _domain(url):
+    return urlparse(url).netloc.lower()
+
+
+class _DomainGate:
+    """Concurrency limit plus a politeness delay between request starts on one domain"""
+
+    def __init__(self, limit, delay_range):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.delay_range = delay_range
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def wait_turn(self):
+        # Reserve the next start slot under the lock, then sleep outside it
+        async with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + random.uniform(*self.delay_range)
+        await asyncio.sleep(start_at - now)
+
+
+class AsyncScrapeEngine:
+    """
+    Scrapes many product pages concurrently in one process.
+    Jobs flow through a bounded queue to a fixed set of workers; each link is
+    tried over plain HTTP first and only rendered in the browser (one context
+    per worker, launched on demand) when that fails. Domains are throttled
+    independently, so a slow politeness delay on one site never holds up another.
+    """
+
+    def __init__(self, concurrency=SCRAPER_CONCURRENCY, domain_concurrency=SCRAPER_DOMAIN_CONCURRENCY,
+                 queue_size=SCRAPER_QUEUE_SIZE,
+                 politeness=(SCRAPER_POLITENESS_MIN, SCRAPER_POLITENESS_MAX), headless=True):
+        self.concurrency = max(1, concurrency)
+        self.domain_concurrency = max(1, domain_concurrency)
+        self.queue_size = max(1, queue_size)
+        self.politeness = politeness
+        self.headless = headless
+        self._gates = {}
+        self._browser = None
+        self._browser_lock = None
+        self._playwright = None
+        self._http = None
+        self.stats = defaultdict(int)
+
+    def _gate(self, url):
+        domain = _domain(url)
+        if domain not in self._gates:
+            self._gates[domain] = _DomainGate(self.domain_concurrency, self.politeness)
+        return self._gates[domain]
+
+    async def _get_browser(self):
+        """Chromium is only launched once some link actually needs the browser tier"""
+        async with self._browser_lock:
+            if self._browser is None:
+                self._browser = await self._playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+            return self._browser
+
+    async def _new_context(self):
+        browser = await self._get_browser()
+        context = await browser.new_context(user_agent=USER_AGENT, viewport=VIEWPORT)
+        await context.add_init_script(ANTI_DETECTION_SCRIPT)
+        return context
+
+    async def _scrape_one(self, contexts, url, platform, options):
+        scraper = ASYNC_SCRAPERS.get(platform)
+        gate = self._gate(url)
+        async with gate.semaphore:
+            await gate.wait_turn()
+
+            # Tier 1: plain HTTP + parser
+            result = await fetch_fast_async(self._http, url, platform, **options)
+            if result is not None:
+                self.stats["tier_http"] += 1
+                return result
+
+            # Tier 2: full browser render
+            if scraper is None:
+                return {"error": f"No async scraper for platform '{platform}'", "rating": None, "reviews": []}
+            if not contexts:
+                contexts.append(await self._new_context())
+            page = await contexts[0].new_page()
+            network = await track_page_async(page)
+            try:
+                result = await scraper(page, url, **options)
+                result["tier"] = "browser"
+                self.stats["tier_browser"] += 1
+                tier_stats.record(platform, "browser")
+                return result
+            finally:
+                try:
+                    self.stats["bytes"] += network.log(page.url)["bytes"]
+                    await page.close()
+                except Exception:
+                    pass
+
+    async def _worker(self, queue, results):
+        contexts = []  # this worker's browser context, opened on first use
+        try:
+            while True:
+                job = await queue.get()
+                if job is None:
+                    queue.task_done()
+                    return
+                key, url, platform = job[:3]
+                options = job[3] if len(job) > 3 else {}
+                started = time.monotonic()
+                try:
+                    results[key] = await self._scrape_one(contexts, url, platform, options)
+                except Exception as e:
+                    results[key] = {"error": str(e), "rating": None, "reviews": []}
+                self.stats["scraped"] += 1
+                self.stats["errors"] += 1 if results[key].get("error") else 0
+                self.stats["seconds"] += time.monotonic() - started
+                queue.task_done()
+        finally:
+            for context in contexts:
+                await context.close()
+
+    async def run(self, jobs):
+        """
+        Scrape every (key, url, platform[, options]) job; options are passed to the platform scraper.
+        Returns: {key: {"rating", "reviews"[, "error"]}}
+        """
+        results = {}
+        queue = asyncio.Queue(maxsize=self.queue_size)
+
+        self._browser_lock = asyncio.Lock()
+
+        async with async_playwright() as p, new_async_http_client() as http:
+            self._playwright, self._http = p, http
+            try:
+                workers = [
+                    asyncio.create_task(self._worker(queue, results))
+                    for _ in range(self.concurrency)
+                ]
+                # put() blocks once the queue is full, keeping memory bounded for large runs
+                for job in jobs:
+                    await queue.put(job)
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                if self._browser is not None:
+                    await self._browser.close()
+                self._browser = None
+
+        print(f"[ENGINE] Scraped {self.stats['scraped']} links ({self.stats['errors']} errors) "
+              f"in {self.stats['seconds']:.1f} page-seconds, {self.stats['bytes'] / 1048576:.1f} MB downloaded "
+              f"(tiers: {self.stats['tier_http']} http, {self.stats['tier_browser']} browser)")
+        return results
+
+
+def scrape_links(jobs, headless=True, **engine_kwargs):
+    """Blocking entry point for sync callers (Celery tasks)"""
+    engine = AsyncScrapeEngine(headless=headless, **engine_kwargs)
+    # Selector stats sync with Redis here, outside the event loop
+    with synced_selector_stats():
+        return asyncio.run(engine.run(jobs))
@@ -0,0 +1,132 @@
+# backend/scraper/benchmark_extraction.py
+# Extraction time per page on the saved fixtures: the old per-element Playwright
+# round trips vs one page.content() parsed offline.
+# Run from the repo root: python -m backend.scraper.benchmark_extraction
+import os
+import time
+
+from playwright.sync_api import sync_playwright
+
+from . import amazon_scraper as amazon
+from . import flipkart_scraper as flipkart
+from . import myntra_scraper as myntra
+from .parsers import parse_reviews
+from .check_fixtures import load
+
+FIXTURES = {
+    "amazon": "amazon_reviews_page1.html",
+    "flipkart": "flipkart_reviews.html",
+    "myntra": "myntra_reviews.html",
+}
+REPEAT = int(os.getenv("BENCH_REPEAT", "20"))
+
+
+def old_amazon(page):
+    rating = None
+    for sel in amazon.RATING_SELECTORS:
+        el = page.locator(sel).first
+        if el.count() > 0:
+            rating = amazon._parse_rating_text(el.inner_text(timeout=5000))
+            break
+    reviews = []
+    for el in page.locator(amazon.REVIEW_SELECTOR).all():
+        text_el = el.locator('[data-hook="review-body"] span').first
+        if text_el.count() == 0:
+            text_el = el.locator('[data-hook="review-body"]').first
+        text = text_el.inner_text(timeout=3000).strip()
+        stars = 5
+        star_el = el.locator(amazon.STAR_SELECTOR).first
+        if star_el.count() > 0:
+            stars = amazon._parse_stars(star_el.inner_text(timeout=3000))
+        if text:
+            reviews.append({"text": text, "stars": stars})
+    return {"rating": rating, "reviews": reviews}
+
+
+def old_flipkart(page):
+    rating = None
+    for sel in flipkart.RATING_SELECTORS:
+        el = page.locator(sel).first
+        if el.count() > 0:
+            rating = flipkart.parse_rating_text(el.inner_text(timeout=5000).strip())
+            if rating:
+                break
+    elements = []
+    for sel in flipkart.REVIEW_CONTAINER_SELECTORS:
+        elements = [el for el in page.locator(sel).all() if len(el.inner_text(timeout=2000)) > flipkart.MIN_CONTAINER_TEXT]
+        if elements:
+            break
+    reviews = []
+    for el in elements[:10]:
+        text, stars = flipkart.clean_review_text(el.inner_text(timeout=3000).strip())
+        if text and len(text) > flipkart.MIN_REVIEW_TEXT:
+            reviews.append({"text": text, "stars": stars})
+    return {"rating": rating, "reviews": reviews}
+
+
+def old_myntra(page):
+    rating = None
+    for sel in myntra.MYNTRA_RATING_SELECTORS:
+        el = page.locator(sel).first
+        if el.count() > 0:
+            rating = myntra.parse_rating_text(el.inner_text(timeout=5000).strip())
+            if rating:
+                break
+    reviews = []
+    for sel in myntra.MYNTRA_REVIEW_SELECTORS:
+        elements = page.locator(sel).all()
+        if elements:
+            for el in elements[:10]:
+                text, stars = myntra.clean_review_text(el.inner_text(timeout=3000).strip())
+                if len(text) > 20:
+                    reviews.append({"text": text, "stars": stars})
+            break
+    return {"rating": rating, "reviews": reviews}
+
+
+OLD_EXTRACTORS = {"amazon": old_amazon, "flipkart": old_flipkart, "myntra": old_myntra}
+
+
+def timed(fn, *args, repeat=REPEAT):
+    fn(*args)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def bench_offline():
+    print(f"Offline parse of the saved HTML ({REPEAT} runs):")
+    for platform, name in FIXTURES.items():
+        html = load(name)
+        ms, parsed = timed(parse_reviews, platform, html)
+        print(f"  {platform:9s}: {ms:7.2f} ms/page ({len(parsed['reviews'])} reviews, {len(html) / 1024:.0f} KB)")
+
+
+def bench_browser():
+    print(f"\nIn Chromium ({REPEAT} runs):")
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        try:
+            for platform, name in FIXTURES.items():
+                page.set_content(load(name))
+                old_ms, old = timed(OLD_EXTRACTORS[platform], page)
+                new_ms, new = timed(lambda: parse_reviews(platform, page.content()))
+                same = old["reviews"] == new["reviews"] and old["rating"] == new["rating"]
+                print(f"  {platform:9s}: per-element {old_ms:7.2f} ms/page | single pass {new_ms:7.2f} ms/page "
+                      f"({old_ms / new_ms:4.1f}x, same output: {same})")
+        finally:
+            browser.close()
+
+
+def main():
+    bench_offline()
+    try:
+        bench_browser()
+    except Exception as e:
+        print(f"\nSkipping the Chromium comparison, the browser could not start: {e}")
+
+
+if __name__ == "__main__":
+    main()
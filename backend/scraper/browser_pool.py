@@ -0,0 +1,194 @@
+# backend/scraper/browser_pool.py
+from playwright.sync_api import sync_playwright
+from contextlib import contextmanager
+from collections import deque
+from .network import track_page
+import threading
+import atexit
+import os
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+VIEWPORT = {'width': 1920, 'height': 1080}
+LAUNCH_ARGS = ['--disable-blink-features=AutomationControlled']
+
+# Anti-detection
+ANTI_DETECTION_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+"""
+
+# Pool sizing (per worker process)
+POOL_BROWSERS = int(os.getenv("SCRAPER_POOL_BROWSERS", "1"))
+POOL_CONTEXTS_PER_BROWSER = int(os.getenv("SCRAPER_POOL_CONTEXTS", "2"))
+POOL_MAX_PAGES_PER_BROWSER = int(os.getenv("SCRAPER_MAX_PAGES_PER_BROWSER", "50"))
+
+
+class _PooledBrowser:
+    """A launched Chromium plus the pages it has served so far"""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages_served = 0
+
+    def new_context(self):
+        context = self.browser.new_context(user_agent=USER_AGENT, viewport=VIEWPORT)
+        context.add_init_script(ANTI_DETECTION_SCRIPT)
+        return context
+
+    def is_healthy(self):
+        try:
+            return self.browser.is_connected()
+        except Exception:
+            return False
+
+    def close(self):
+        try:
+            self.browser.close()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium browsers with pre-warmed contexts.
+    Playwright's sync API is bound to the thread that started it, so a pool
+    must only be used from one thread - use get_browser_pool() to get the
+    pool for the current thread.
+    """
+
+    def __init__(self, headless=True, browsers=POOL_BROWSERS,
+                 contexts_per_browser=POOL_CONTEXTS_PER_BROWSER,
+                 max_pages_per_browser=POOL_MAX_PAGES_PER_BROWSER):
+        self.headless = headless
+        self.browsers = max(1, browsers)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.max_pages_per_browser = max_pages_per_browser
+        self._playwright = None
+        self._pooled = []
+        self._idle = deque()  # (pooled_browser, context)
+        self.stats = {"launches": 0, "recycles": 0, "unhealthy": 0, "pages": 0, "bytes": 0}
+
+    def start(self):
+        if self._playwright is not None:
+            return
+        self._playwright = sync_playwright().start()
+        for _ in range(self.browsers):
+            self._launch()
+
+    def _launch(self):
+        browser = self._playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+        pooled = _PooledBrowser(browser)
+        self._pooled.append(pooled)
+        for _ in range(self.contexts_per_browser):
+            self._idle.append((pooled, pooled.new_context()))
+        self.stats["launches"] += 1
+        print(f"[POOL] Launched browser ({len(self._pooled)} active)")
+        return pooled
+
+    def _retire(self, pooled):
+        """Close a browser and drop its idle contexts, then launch a replacement"""
+        self._idle = deque((p, c) for p, c in self._idle if p is not pooled)
+        if pooled in self._pooled:
+            self._pooled.remove(pooled)
+        pooled.close()
+        self._launch()
+
+    def _acquire(self):
+        self.start()
+        while self._idle:
+            pooled, context = self._idle.popleft()
+            if pooled not in self._pooled:
+                continue
+            if not pooled.is_healthy():
+                print("[POOL] Browser failed health check, relaunching")
+                self.stats["unhealthy"] += 1
+                self._retire(pooled)
+                continue
+            return pooled, context
+
+        # Every context is handed out (nested use) - open an extra one on the least used browser
+        pooled = min(self._pooled, key=lambda p: p.pages_served)
+        return pooled, pooled.new_context()
+
+    def _release(self, pooled, context):
+        pooled.pages_served += 1
+        self.stats["pages"] += 1
+
+        if pooled.pages_served >= self.max_pages_per_browser:
+            print(f"[POOL] Browser served {pooled.pages_served} pages, recycling")
+            self.stats["recycles"] += 1
+            self._retire(pooled)
+            return
+
+        if len([1 for p, _ in self._idle if p is pooled]) >= self.contexts_per_browser:
+            # Extra context opened under contention - don't keep it around
+            try:
+                context.close()
+            except Exception:
+                pass
+            return
+
+        self._idle.append((pooled, context))
+
+    @contextmanager
+    def page(self):
+        """
+        Hand out a fresh page in a pre-warmed context, returning the context afterwards.
+        Heavy resources are blocked and the page's traffic is logged when it's done.
+        """
+        pooled, context = self._acquire()
+        page = context.new_page()
+        network = track_page(page)
+        try:
+            yield page
+        finally:
+            try:
+                self.stats["bytes"] += network.log(page.url)["bytes"]
+            except Exception:
+                pass
+            finally:
+                try:
+                    page.close()
+                except Exception:
+                    pass
+                self._release(pooled, context)
+
+    def close(self):
+        for pooled in self._pooled:
+            pooled.close()
+        self._pooled = []
+        self._idle.clear()
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+
+_local = threading.local()
+
+
+def get_browser_pool(headless=True):
+    """Return this thread's pool for the given headless mode, creating it on first use"""
+    pools = getattr(_local, "pools", None)
+    if pools is None:
+        pools = _local.pools = {}
+    if headless not in pools:
+        pools[headless] = BrowserPool(headless=headless)
+    return pools[headless]
+
+
+def close_browser_pools():
+    """
+    Shut down the calling thread's pools. Playwright's sync API can't be driven from
+    another thread, so every thread that scrapes closes its own pools (Celery's
+    worker_process_shutdown for the task thread, atexit for the main thread).
+    """
+    pools = _local.__dict__.pop("pools", None) or {}
+    for pool in pools.values():
+        pool.close()
+
+
+atexit.register(close_browser_pools)
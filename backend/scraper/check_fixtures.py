@@ -0,0 +1,225 @@
+# backend/scraper/check_fixtures.py
+# Runs the offline parsers, the HTTP fast path and the Amazon browser fallbacks against the
+# saved pages in fixtures/ (the browser ones on a fake page, so no Chromium is needed;
+# they sit through the scraper's settle waits, about 20 s).
+# Run from the repo root: python -m backend.scraper.check_fixtures
+import asyncio
+import os
+import sys
+
+from bs4 import BeautifulSoup
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+from playwright.async_api import TimeoutError as AsyncPlaywrightTimeout
+
+from .parsers import parse_reviews, detect_bot_wall
+from .http_fetcher import fast_path_steps
+from .amazon_scraper import _incremental_on_page, scrape_amazon_reviews_async, reviews_page_url
+from ..nlp.inference_cache import review_hash
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+AMAZON_URL = "https://www.amazon.in/boAt-Airdopes-141/dp/B0C1234567/ref=sr_1_1"
+
+# fixture -> (platform, expected rating, expected stars per review, has_next)
+EXPECTED = {
+    "amazon_reviews_page1.html": ("amazon", 4.1, [5, 2, 4], True),
+    "amazon_reviews_page2.html": ("amazon", 4.1, [3, 1], False),
+    "flipkart_reviews.html": ("flipkart", 4.2, [5, 2, 4], False),
+    "myntra_reviews.html": ("myntra", 4.3, [5, 3], False),
+}
+
+
+def load(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def run_steps(steps, pages):
+    """Drive fast_path_steps with fixture pages instead of the network"""
+    fetched = []
+    try:
+        url = next(steps)
+        while True:
+            fetched.append(url)
+            name = pages.get(url)
+            url = steps.send((200, load(name)) if name else (404, ""))
+    except StopIteration as done:
+        return done.value, fetched
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.ok = 200 <= status < 300
+
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page, self.selector = page, selector
+
+    @property
+    def first(self):
+        return self
+
+    def count(self):
+        return len(self.page.soup.select(self.selector))
+
+    def scroll_into_view_if_needed(self, timeout=None):
+        pass
+
+    def click(self):
+        self.page.goto(self.page.soup.select_one(self.selector)["href"])
+
+
+class FakePage:
+    """
+    The parts of a Playwright page the Amazon scraper uses, serving fixture files by URL
+    (url -> (status, fixture name)); unknown URLs answer 404
+    """
+
+    timeout_error = PlaywrightTimeout
+
+    def __init__(self, routes):
+        self.routes, self.visited = routes, []
+        self.html, self.soup = "", BeautifulSoup("", "html.parser")
+
+    def goto(self, url, timeout=None, wait_until=None):
+        self.visited.append(url)
+        status, name = self.routes.get(url, (404, None))
+        self.html = load(name) if name else ""
+        self.soup = BeautifulSoup(self.html, "html.parser")
+        return FakeResponse(status)
+
+    def wait_for_selector(self, selector, timeout=None):
+        if not self.soup.select(selector):
+            raise self.timeout_error(f"waiting for {selector}")
+
+    def wait_for_load_state(self, state=None):
+        pass
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+    def evaluate(self, script):
+        pass
+
+    def content(self):
+        return self.html
+
+
+class FakeAsyncLocator(FakeLocator):
+    async def count(self):
+        return super().count()
+
+    async def scroll_into_view_if_needed(self, timeout=None):
+        pass
+
+    async def click(self):
+        super().click()
+
+
+class FakeAsyncPage(FakePage):
+    timeout_error = AsyncPlaywrightTimeout
+
+    async def goto(self, url, timeout=None, wait_until=None):
+        return super().goto(url)
+
+    async def wait_for_selector(self, selector, timeout=None):
+        super().wait_for_selector(selector)
+
+    async def wait_for_load_state(self, state=None):
+        pass
+
+    def locator(self, selector):
+        return FakeAsyncLocator(self, selector)
+
+    async def evaluate(self, script):
+        pass
+
+    async def content(self):
+        return self.html
+
+
+def main():
+    failures = []
+
+    def check(label, ok, detail=""):
+        print(f"  {'PASS' if ok else 'FAIL'}  {label} {detail}")
+        if not ok:
+            failures.append(label)
+
+    print("Parsers:")
+    for name, (platform, rating, stars, has_next) in EXPECTED.items():
+        parsed = parse_reviews(platform, load(name))
+        check(f"{name} rating", parsed["rating"] == rating, f"({parsed['rating']})")
+        check(f"{name} reviews", [r["stars"] for r in parsed["reviews"]] == stars,
+              f"({len(parsed['reviews'])} reviews)")
+        check(f"{name} text", all(len(r["text"]) > 20 and "★" not in r["text"] for r in parsed["reviews"]))
+        check(f"{name} next page", parsed["has_next"] == has_next)
+        check(f"{name} not a bot wall", detect_bot_wall(load(name)) is None)
+
+    # A page whose only rating match is the broad selector must not pin it ahead of the specific ones
+    parse_reviews("amazon", '<i class="a-icon"><span class="a-icon-alt">3.9 out of 5 stars</span></i>')
+    parsed = parse_reviews("amazon", load("amazon_reviews_page2.html"))
+    check("broad rating selector stays behind the specific ones", parsed["rating"] == 4.1, f"({parsed['rating']})")
+
+    print("Fast path:")
+    pages = {
+        "https://www.amazon.in/product-reviews/B0C1234567/?sortBy=recent&pageNumber=1": "amazon_reviews_page1.html",
+        "https://www.amazon.in/product-reviews/B0C1234567/?sortBy=recent&pageNumber=2": "amazon_reviews_page2.html",
+    }
+    (result, outcome), fetched = run_steps(fast_path_steps(AMAZON_URL, "amazon"), pages)
+    check("full scrape served over http", outcome == "http" and len(result["reviews"]) == 3 and len(fetched) == 1)
+
+    (result, outcome), fetched = run_steps(fast_path_steps(AMAZON_URL, "amazon", known_hashes=set()), pages)
+    check("incremental walks every page", outcome == "http" and result["pages"] == 2 and len(result["reviews"]) == 5)
+
+    first_page = parse_reviews("amazon", load("amazon_reviews_page1.html"))["reviews"]
+    known = {review_hash(first_page[1]["text"])}
+    (result, outcome), fetched = run_steps(fast_path_steps(AMAZON_URL, "amazon", known_hashes=known), pages)
+    check("incremental stops at a known review",
+          result["pages"] == 1 and len(result["reviews"]) == 1 and result["skipped"] == 2 and len(fetched) == 1)
+
+    captcha = {url: "amazon_captcha.html" for url in pages}
+    (result, outcome), _ = run_steps(fast_path_steps(AMAZON_URL, "amazon"), captcha)
+    check("bot wall falls back to the browser", result is None and outcome == "bot_wall")
+
+    (result, outcome), _ = run_steps(fast_path_steps(AMAZON_URL, "amazon"), {})
+    check("error status falls back to the browser", result is None and outcome == "bad_status")
+
+    (result, outcome), _ = run_steps(fast_path_steps("https://amzn.in/d/abc123", "amazon"), {})
+    check("link without ASIN goes straight to the browser", result is None and outcome == "unsupported")
+
+    print("Browser fallbacks:")
+    product_page = parse_reviews("amazon", load("amazon_product_page.html"))
+    signin = {reviews_page_url(AMAZON_URL, 1): (200, "amazon_signin.html"),
+              AMAZON_URL: (200, "amazon_product_page.html")}
+    page = FakePage(signin)
+    result = _incremental_on_page(page, AMAZON_URL, set(), 3)
+    check("incremental behind a sign-in wall falls back to the product page",
+          result["reviews"] == product_page["reviews"] and result["rating"] == product_page["rating"]
+          and page.visited[-1] == AMAZON_URL)
+
+    error_status = {reviews_page_url(AMAZON_URL, 1): (503, "amazon_signin.html"),
+                    AMAZON_URL: (200, "amazon_product_page.html")}
+    result = _incremental_on_page(FakePage(error_status), AMAZON_URL, set(), 3)
+    check("incremental on an error status falls back to the product page",
+          result["reviews"] == product_page["reviews"])
+
+    page = FakeAsyncPage(signin)
+    result = asyncio.run(scrape_amazon_reviews_async(page, AMAZON_URL, known_hashes=set(), max_pages=3))
+    check("async incremental behind a sign-in wall falls back to the product page",
+          result["reviews"] == product_page["reviews"] and page.visited[-1] == AMAZON_URL)
+
+    walked = {reviews_page_url(AMAZON_URL, 1): (200, "amazon_reviews_page1.html"),
+              reviews_page_url(AMAZON_URL, 2): (200, "amazon_reviews_page2.html")}
+    page = FakePage(walked)
+    result = _incremental_on_page(page, AMAZON_URL, set(), 3)
+    check("incremental that loaded review pages doesn't touch the product page",
+          result["pages"] == 2 and len(result["reviews"]) == 5 and AMAZON_URL not in page.visited)
+
+    print(f"\n{len(failures)} failed" if failures else "\nAll fixture checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
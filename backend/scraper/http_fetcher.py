@@ -0,0 +1,165 @@
+# backend/scraper/http_fetcher.py
+# Tier 1 of the scrapers: plain HTTP + offline parser. Callers fall back to the
+# Playwright scrapers (tier 2) whenever this returns None.
+from collections import defaultdict
+import threading
+import os
+
+import httpx
+
+from .browser_pool import USER_AGENT
+from .parsers import PARSERS, parse_reviews, detect_bot_wall
+from .amazon_scraper import reviews_page_url, _take_new_reviews, AMAZON_MAX_REVIEW_PAGES
+from .flipkart_scraper import flipkart_reviews_url
+from .myntra_scraper import myntra_reviews_url
+
+SCRAPER_HTTP_FAST_PATH = os.getenv("SCRAPER_HTTP_FAST_PATH", "true").lower() != "false"
+HTTP_TIMEOUT = float(os.getenv("SCRAPER_HTTP_TIMEOUT", "15"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("SCRAPER_HTTP_MAX_CONNECTIONS", "20"))
+
+HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-IN,en;q=0.9",
+}
+
+
+def _limits():
+    return httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_CONNECTIONS)
+
+
+def review_url(platform, url, page_number=1):
+    """URL the fast path fetches for a page of reviews, or None if it can't handle the link"""
+    if platform == "amazon":
+        return reviews_page_url(url, page_number)
+    if page_number > 1:
+        return None
+    if platform == "flipkart":
+        return flipkart_reviews_url(url) or url
+    if platform == "myntra":
+        return myntra_reviews_url(url) or url
+    return None
+
+
+def fast_path_steps(url, platform, known_hashes=None, max_pages=AMAZON_MAX_REVIEW_PAGES):
+    """
+    Sans-IO fast path shared by the sync and async drivers: yields URLs to fetch and is
+    sent back (status_code, html) for each. Returns (result, outcome); result is None
+    when the page failed validation and the browser has to take over.
+    known_hashes switches Amazon to incremental paging, like scrape_amazon_reviews_incremental.
+    """
+    if platform not in PARSERS or review_url(platform, url) is None:
+        return None, "unsupported"
+
+    incremental = known_hashes is not None and platform == "amazon"
+    rating, new_reviews, seen, pages, skipped = None, [], set(), 0, 0
+
+    for page_number in range(1, (max_pages if incremental else 1) + 1):
+        status, html = yield review_url(platform, url, page_number)
+        if status != 200:
+            return None, "bad_status"
+        if detect_bot_wall(html):
+            return None, "bot_wall"
+
+        parsed = parse_reviews(platform, html)
+        if page_number == 1:
+            # A review page that parses to no reviews is more likely a layout change than an empty product
+            if not parsed["reviews"]:
+                return None, "invalid"
+            rating = parsed["rating"]
+        if not incremental:
+            return {"rating": rating, "reviews": parsed["reviews"], "tier": "http"}, "http"
+
+        pages += 1
+        page_new, reached_known, skipped = _take_new_reviews(parsed["reviews"], known_hashes, seen)
+        new_reviews.extend(page_new)
+        if reached_known or not parsed["has_next"]:
+            break
+
+    return {"rating": rating, "reviews": new_reviews, "incremental": True,
+            "pages": pages, "skipped": skipped, "tier": "http"}, "http"
+
+
+class TierStats:
+    """Per-platform counts of links served over HTTP and of each reason for falling back"""
+
+    def __init__(self):
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, platform, outcome):
+        with self._lock:
+            self._counts[(platform, outcome)] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        stats = defaultdict(dict)
+        for (platform, outcome), n in counts.items():
+            stats[platform][outcome] = n
+        return dict(stats)
+
+
+tier_stats = TierStats()
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Process-wide keep-alive client for the blocking fast path (httpx.Client is thread safe)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(headers=HEADERS, timeout=HTTP_TIMEOUT, follow_redirects=True, limits=_limits())
+        return _client
+
+
+def new_async_http_client():
+    """Async client for one event loop (the async engine opens one per run)"""
+    return httpx.AsyncClient(headers=HEADERS, timeout=HTTP_TIMEOUT, follow_redirects=True, limits=_limits())
+
+
+def fetch_fast(url, platform, known_hashes=None, max_pages=AMAZON_MAX_REVIEW_PAGES, client=None):
+    """Blocking fast path: a result dict served over HTTP, or None to use the browser"""
+    if not SCRAPER_HTTP_FAST_PATH:
+        return None
+    client = client or get_http_client()
+    steps = fast_path_steps(url, platform, known_hashes, max_pages)
+    try:
+        target = next(steps)
+        while True:
+            response = client.get(target)
+            target = steps.send((response.status_code, response.text))
+    except StopIteration as done:
+        result, outcome = done.value
+    except httpx.HTTPError as e:
+        print(f"[HTTP] {url} failed: {e}")
+        result, outcome = None, "http_error"
+
+    tier_stats.record(platform, outcome)
+    if result is None:
+        print(f"[HTTP] Fast path declined {url} ({outcome}), using the browser")
+    return result
+
+
+async def fetch_fast_async(client, url, platform, known_hashes=None, max_pages=AMAZON_MAX_REVIEW_PAGES):
+    """asyncio driver for fast_path_steps"""
+    if not SCRAPER_HTTP_FAST_PATH:
+        return None
+    steps = fast_path_steps(url, platform, known_hashes, max_pages)
+    try:
+        target = next(steps)
+        while True:
+            response = await client.get(target)
+            target = steps.send((response.status_code, response.text))
+    except StopIteration as done:
+        result, outcome = done.value
+    except httpx.HTTPError as e:
+        print(f"[HTTP] {url} failed: {e}")
+        result, outcome = None, "http_error"
+
+    tier_stats.record(platform, outcome)
+    if result is None:
+        print(f"[HTTP] Fast path declined {url} ({outcome}), using the browser")
+    return result
@@ -1,210 +1,141 @@
 # backend/scraper/additional_scrapers.py
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from .browser_pool import get_browser_pool
+from .network import goto_first
+from .selector_registry import wait_for_any
+from . import parsers
+from urllib.parse import urlparse
 import time
 import random
 import re
 
+MYNTRA_RATING_SELECTORS = [
+    'div.index-overallRating',
+    'div[class*="rating"]',
+    'span.index-overallRating',
+]
+# Most specific first: the container selectors also match the whole review list as one element
+MYNTRA_REVIEW_SELECTORS = [
+    'div.user-review-main',
+    'div[class*="userReview"]',
+    'div.detailed-reviews-userReviewsContainer',
+]
+# Match the whole rating block / review list; only tried after the specific selectors
+MYNTRA_BROAD_SELECTORS = ('div[class*="rating"]', 'div.detailed-reviews-userReviewsContainer')
+SNAPDEAL_RATING_SELECTORS = [
+    'span.avrg-rating',
+    'div[class*="rating"]',
+    'span.filled-stars',
+]
+SNAPDEAL_REVIEW_SELECTORS = [
+    'div.user-review',
+    'div[class*="review-box"]',
+    'li.review-list',
+]
+# Matches any rating-ish block on the page; only tried after the specific selectors
+SNAPDEAL_BROAD_SELECTORS = ('div[class*="rating"]',)
+MYNTRA_STYLE_ID_RE = re.compile(r'/(\d{5,})(?:/buy)?/?$')
+SNAPDEAL_PRODUCT_RE = re.compile(r'^(/product/[^/]+/\d+)')
+
+
+def parse_rating_text(text):
+    match = re.search(r'(\d+\.?\d*)', text)
+    return float(match.group(1)) if match else None
+
+
+def clean_review_text(text):
+    """Review text and stars from a review block: the longest line without the "N★" badge"""
+    # Extract star rating
+    stars = 5
+    star_match = re.search(r'(\d+)★', text)
+    if star_match:
+        stars = int(star_match.group(1))
+    
+    # Clean text
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    # Usually review text is the longest line
+    text = max(lines, key=len) if lines else text
+    text = re.sub(r'\d+★', '', text)
+    return text.strip(), stars
+
+
+def myntra_reviews_url(url):
+    """Review-only page for a product URL (.../<style id>/buy -> /reviews/<style id>), or None"""
+    parts = urlparse(url)
+    match = MYNTRA_STYLE_ID_RE.search(parts.path)
+    return f"{parts.scheme or 'https'}://{parts.netloc}/reviews/{match.group(1)}" if match else None
+
+
+def snapdeal_reviews_url(url):
+    """Review-only listing for a product URL (/product/<slug>/<id> -> .../reviews), or None"""
+    parts = urlparse(url)
+    match = SNAPDEAL_PRODUCT_RE.search(parts.path)
+    return f"{parts.scheme or 'https'}://{parts.netloc}{match.group(1)}/reviews?sortBy=RECENCY" if match else None
+
+
 def scrape_myntra_reviews(url: str, headless=True):
     """Myntra - Fashion platform with clean structure"""
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=headless,
-            args=['--disable-blink-features=AutomationControlled']
-        )
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080}
-        )
-        
-        context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-        """)
-        
-        page = context.new_page()
+    # Plain HTTP first; the browser only runs when that fails validation or hits a bot wall
+    from .http_fetcher import fetch_fast
+    fast = fetch_fast(url, "myntra")
+    if fast is not None:
+        return fast
 
+    with get_browser_pool(headless).page() as page:
         try:
             print(f"[MYNTRA] Navigating to: {url}")
-            page.goto(url, timeout=60000, wait_until='domcontentloaded')
-            time.sleep(random.uniform(2, 4))
+            # Lighter review-only page first; the full product page is the fallback
+            review_url = myntra_reviews_url(url)
+            on_review_page = goto_first(page, [review_url, url] if review_url else [url]) == review_url
+            time.sleep(random.uniform(1, 2) if on_review_page else random.uniform(2, 4))
             
-            # Extract rating
-            rating = None
-            rating_selectors = [
-                'div.index-overallRating',
-                'div[class*="rating"]',
-                'span.index-overallRating',
-            ]
-            
-            for sel in rating_selectors:
-                try:
-                    el = page.locator(sel).first
-                    if el.count() > 0:
-                        text = el.inner_text(timeout=5000).strip()
-                        match = re.search(r'(\d+\.?\d*)', text)
-                        if match:
-                            rating = float(match.group(1))
-                            print(f"[MYNTRA] Rating found: {rating}")
-                            break
-                except:
-                    continue
-            
-            # Scroll to reviews
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight * 0.7)")
-            time.sleep(2)
-            
-            # Extract reviews
-            reviews = []
-            review_selectors = [
-                'div.detailed-reviews-userReviewsContainer',
-                'div[class*="userReview"]',
-                'div.user-review-main',
-            ]
+            # Scroll to reviews (the review page lists them up front)
+            if not on_review_page:
+                page.evaluate("window.scrollTo(0, document.body.scrollHeight * 0.7)")
+                time.sleep(2)
             
+            # Wait for any review selector (last winner first), then extract rating and reviews in a single pass
             print("[MYNTRA] Looking for reviews...")
-            for sel in review_selectors:
-                try:
-                    page.wait_for_selector(sel, timeout=10000)
-                    review_elements = page.locator(sel).all()
-                    
-                    if len(review_elements) > 0:
-                        print(f"[MYNTRA] Found {len(review_elements)} reviews with: {sel}")
-                        
-                        for idx, el in enumerate(review_elements[:10]):
-                            try:
-                                text = el.inner_text(timeout=3000).strip()
-                                
-                                # Extract star rating
-                                stars = 5
-                                star_match = re.search(r'(\d+)★', text)
-                                if star_match:
-                                    stars = int(star_match.group(1))
-                                
-                                # Clean text
-                                lines = [line.strip() for line in text.split('\n') if line.strip()]
-                                # Usually review text is the longest line
-                                text = max(lines, key=len) if lines else text
-                                text = re.sub(r'\d+★', '', text)
-                                text = text.strip()
-                                
-                                if len(text) > 20:
-                                    reviews.append({"text": text, "stars": stars})
-                                    print(f"[MYNTRA] Extracted review {idx + 1}: {stars} stars")
-                            except:
-                                continue
-                        break
-                except PlaywrightTimeout:
-                    continue
+            if not wait_for_any(page, "myntra", "reviews", MYNTRA_REVIEW_SELECTORS, MYNTRA_BROAD_SELECTORS):
+                print("[MYNTRA] No review elements appeared")
+            
+            parsed = parsers.parse_myntra_reviews(page.content())
+            rating, reviews = parsed["rating"], parsed["reviews"]
             
-            browser.close()
             print(f"[MYNTRA] Final: {len(reviews)} reviews, rating: {rating}")
             return {"rating": rating, "reviews": reviews}
 
         except Exception as e:
             print(f"[MYNTRA] Error: {e}")
-            browser.close()
             return {"error": str(e), "rating": None, "reviews": []}
 
 
 
 def scrape_snapdeal_reviews(url: str, headless=True):
     """Snapdeal - Older platform, stable selectors"""
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=headless,
-            args=['--disable-blink-features=AutomationControlled']
-        )
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080}
-        )
-        
-        context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-        """)
-        
-        page = context.new_page()
-
+    with get_browser_pool(headless).page() as page:
         try:
             print(f"[SNAPDEAL] Navigating to: {url}")
-            page.goto(url, timeout=60000, wait_until='domcontentloaded')
-            time.sleep(random.uniform(2, 4))
+            # Lighter review-only page first; the full product page is the fallback
+            review_url = snapdeal_reviews_url(url)
+            on_review_page = goto_first(page, [review_url, url] if review_url else [url]) == review_url
+            time.sleep(random.uniform(1, 2) if on_review_page else random.uniform(2, 4))
             
-            # Extract rating
-            rating = None
-            rating_selectors = [
-                'span.avrg-rating',
-                'div[class*="rating"]',
-                'span.filled-stars',
-            ]
-            
-            for sel in rating_selectors:
-                try:
-                    el = page.locator(sel).first
-                    if el.count() > 0:
-                        text = el.inner_text(timeout=5000).strip()
-                        match = re.search(r'(\d+\.?\d*)', text)
-                        if match:
-                            rating = float(match.group(1))
-                            print(f"[SNAPDEAL] Rating found: {rating}")
-                            break
-                except:
-                    continue
-            
-            # Scroll to reviews
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight * 0.6)")
-            time.sleep(2)
-            
-            # Extract reviews
-            reviews = []
-            review_selectors = [
-                'div.user-review',
-                'div[class*="review-box"]',
-                'li.review-list',
-            ]
+            # Scroll to reviews (the review page lists them up front)
+            if not on_review_page:
+                page.evaluate("window.scrollTo(0, document.body.scrollHeight * 0.6)")
+                time.sleep(2)
             
+            # Wait for any review selector (last winner first), then extract rating and reviews in a single pass
             print("[SNAPDEAL] Looking for reviews...")
-            for sel in review_selectors:
-                try:
-                    page.wait_for_selector(sel, timeout=10000)
-                    review_elements = page.locator(sel).all()
-                    
-                    if len(review_elements) > 0:
-                        print(f"[SNAPDEAL] Found {len(review_elements)} reviews with: {sel}")
-                        
-                        for idx, el in enumerate(review_elements[:10]):
-                            try:
-                                text = el.inner_text(timeout=3000).strip()
-                                
-                                # Extract star rating
-                                stars = 5
-                                star_match = re.search(r'(\d+)★', text)
-                                if star_match:
-                                    stars = int(star_match.group(1))
-                                
-                                # Clean text
-                                lines = [line.strip() for line in text.split('\n') if line.strip()]
-                                text = max(lines, key=len) if lines else text
-                                text = re.sub(r'\d+★', '', text)
-                                text = text.strip()
-                                
-                                if len(text) > 20:
-                                    reviews.append({"text": text, "stars": stars})
-                                    print(f"[SNAPDEAL] Extracted review {idx + 1}: {stars} stars")
-                            except:
-                                continue
-                        break
-                except PlaywrightTimeout:
-                    continue
+            if not wait_for_any(page, "snapdeal", "reviews", SNAPDEAL_REVIEW_SELECTORS):
+                print("[SNAPDEAL] No review elements appeared")
+            
+            parsed = parsers.parse_snapdeal_reviews(page.content())
+            rating, reviews = parsed["rating"], parsed["reviews"]
             
-            browser.close()
             print(f"[SNAPDEAL] Final: {len(reviews)} reviews, rating: {rating}")
             return {"rating": rating, "reviews": reviews}
 
         except Exception as e:
             print(f"[SNAPDEAL] Error: {e}")
-            browser.close()
             return {"error": str(e), "rating": None, "reviews": []}
\ No newline at end of file
@@ -0,0 +1,145 @@
+# backend/scraper/network.py
+# Request interception and network accounting shared by the scrapers
+from urllib.parse import urlparse
+import time
+import os
+
+SCRAPER_BLOCKING = os.getenv("SCRAPER_BLOCKING", "true").lower() != "false"
+
+# Playwright resource types we never need for text extraction
+BLOCK_RESOURCE_TYPES = os.getenv("SCRAPER_BLOCK_RESOURCE_TYPES", "image,media,font")
+
+# Ads, analytics and tracking - matched on the host and all its subdomains
+BLOCK_DOMAINS = os.getenv(
+    "SCRAPER_BLOCK_DOMAINS",
+    "doubleclick.net,googlesyndication.com,googleadservices.com,google-analytics.com,"
+    "googletagmanager.com,amazon-adsystem.com,adsystem.amazon.com,fls-eu.amazon.com,fls-na.amazon.com,"
+    "unagi.amazon.in,unagi.amazon.com,facebook.net,facebook.com,scorecardresearch.com,criteo.com,"
+    "criteo.net,adnxs.com,hotjar.com,clarity.ms,branch.io,moengage.com,webengage.com,sentry.io"
+)
+
+
+def _csv(value):
+    return frozenset(v.strip().lower() for v in value.split(",") if v.strip())
+
+
+class BlockRules:
+    """Which requests to abort: by resource type, or by host (the domain or any subdomain)"""
+
+    def __init__(self, resource_types=BLOCK_RESOURCE_TYPES, domains=BLOCK_DOMAINS):
+        self.resource_types = _csv(resource_types) if isinstance(resource_types, str) else frozenset(resource_types)
+        self.domains = _csv(domains) if isinstance(domains, str) else frozenset(domains)
+
+    def should_block(self, resource_type, url):
+        if resource_type in self.resource_types:
+            return True
+        host = (urlparse(url).hostname or "").lower()
+        while host:
+            if host in self.domains:
+                return True
+            host = host.partition(".")[2]
+        return False
+
+
+DEFAULT_RULES = BlockRules()
+
+
+class PageNetworkStats:
+    """Bytes on the wire, request counts and load timing for one scraped page"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.bytes = 0
+        self.requests = 0
+        self.blocked = 0
+        self.dom_ready_ms = None
+
+    def on_loading_finished(self, event):
+        # encodedDataLength is the transferred size (headers + compressed body)
+        self.bytes += int(event.get("encodedDataLength") or 0)
+        self.requests += 1
+
+    def on_dom_ready(self, *args):
+        if self.dom_ready_ms is None:
+            self.dom_ready_ms = (time.monotonic() - self.started) * 1000
+
+    def summary(self):
+        return {
+            "bytes": self.bytes,
+            "requests": self.requests,
+            "blocked": self.blocked,
+            "dom_ready_ms": round(self.dom_ready_ms) if self.dom_ready_ms is not None else None,
+            "total_ms": round((time.monotonic() - self.started) * 1000),
+        }
+
+    def log(self, url):
+        s = self.summary()
+        print(f"[NET] {url} | {s['bytes'] / 1024:.0f} KB in {s['requests']} requests, {s['blocked']} blocked "
+              f"| DOM ready {s['dom_ready_ms']} ms, total {s['total_ms']} ms")
+        return s
+
+
+def track_page(page, rules=DEFAULT_RULES, blocking=SCRAPER_BLOCKING):
+    """Install the block rules on a sync Playwright page and start counting its traffic"""
+    stats = PageNetworkStats()
+
+    def handle(route):
+        request = route.request
+        if rules.should_block(request.resource_type, request.url):
+            stats.blocked += 1
+            route.abort()
+        else:
+            route.continue_()
+
+    if blocking:
+        page.route("**/*", handle)
+    page.on("domcontentloaded", stats.on_dom_ready)
+    try:
+        # Chromium only: byte counts come from the DevTools network domain
+        cdp = page.context.new_cdp_session(page)
+        cdp.on("Network.loadingFinished", stats.on_loading_finished)
+        cdp.send("Network.enable")
+    except Exception as e:
+        print(f"[NET] Byte counting unavailable: {e}")
+    return stats
+
+
+async def track_page_async(page, rules=DEFAULT_RULES, blocking=SCRAPER_BLOCKING):
+    """asyncio version of track_page"""
+    stats = PageNetworkStats()
+
+    async def handle(route):
+        request = route.request
+        if rules.should_block(request.resource_type, request.url):
+            stats.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    if blocking:
+        await page.route("**/*", handle)
+    page.on("domcontentloaded", stats.on_dom_ready)
+    try:
+        cdp = await page.context.new_cdp_session(page)
+        cdp.on("Network.loadingFinished", stats.on_loading_finished)
+        await cdp.send("Network.enable")
+    except Exception as e:
+        print(f"[NET] Byte counting unavailable: {e}")
+    return stats
+
+
+def goto_first(page, urls, timeout=60000):
+    """
+    Navigate to the first URL that answers with a success status, trying lighter
+    review-only pages before the full product page. Returns the URL that loaded.
+    """
+    for candidate in urls[:-1]:
+        try:
+            response = page.goto(candidate, timeout=timeout, wait_until='domcontentloaded')
+            if response is not None and response.ok:
+                return candidate
+            print(f"[NET] {candidate} answered {response.status if response else 'nothing'}, falling back")
+        except Exception as e:
+            print(f"[NET] {candidate} failed ({e}), falling back")
+    page.goto(urls[-1], timeout=timeout, wait_until='domcontentloaded')
+    return urls[-1]
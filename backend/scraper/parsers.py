@@ -0,0 +1,168 @@
+# backend/scraper/parsers.py
+# Offline parsers for saved or HTTP-fetched review pages. They apply the same
+# selectors and text cleanup as the Playwright scrapers, on static HTML.
+from bs4 import BeautifulSoup
+
+from . import amazon_scraper as amazon
+from . import flipkart_scraper as flipkart
+from . import myntra_scraper as myntra
+from .selector_registry import get_selector_registry
+
+# Markers of captcha / robot-check interstitials served instead of the real page
+BOT_WALL_MARKERS = (
+    "/errors/validatecaptcha",
+    "enter the characters you see below",
+    "to discuss automated access to amazon data",
+    "are you a human",
+    "please verify you are a human",
+    "captcha-delivery.com",
+    "<title>access denied</title>",
+)
+MAX_REVIEWS = 10  # Flipkart/Myntra/Snapdeal scrapers keep the first ten
+
+
+def detect_bot_wall(html):
+    """The matching marker if html is a bot check instead of the page we asked for, else None"""
+    head = html[:200000].lower()
+    for marker in BOT_WALL_MARKERS:
+        if marker in head:
+            return marker
+    return None
+
+
+def _soup(html):
+    return BeautifulSoup(html, "lxml")
+
+
+def _text(el):
+    # Close to Playwright's inner_text: block children on their own lines
+    return el.get_text("\n", strip=True)
+
+
+def _css_only(selectors):
+    """Drop Playwright-only selector syntax (text=, >>, :has-text) the offline parser can't run"""
+    return [s for s in selectors if ">>" not in s and "text=" not in s and ":has-text" not in s]
+
+
+def _first_match(platform, kind, selectors, extract, fallbacks=()):
+    """
+    extract(selector) for each selector in the registry's adaptive order until one
+    returns something; the winner and the misses before it are recorded.
+    """
+    registry = get_selector_registry()
+    tried = []
+    for sel in registry.ordered(platform, kind, selectors, fallbacks):
+        tried.append(sel)
+        value = extract(sel)
+        if value:
+            registry.record(platform, kind, sel, tried)
+            return value
+    registry.record(platform, kind, None, tried)
+    return None
+
+
+def parse_amazon_reviews(html):
+    soup = _soup(html)
+
+    def rating_at(sel):
+        el = soup.select_one(sel)
+        if el is None:
+            return None
+        try:
+            return amazon._parse_rating_text(_text(el))
+        except ValueError:
+            return None
+
+    rating = _first_match("amazon", "rating", amazon.RATING_SELECTORS, rating_at, amazon.BROAD_RATING_SELECTORS)
+
+    reviews = []
+    for el in soup.select(amazon.REVIEW_SELECTOR):
+        text_el = el.select_one('[data-hook="review-body"] span') or el.select_one('[data-hook="review-body"]')
+        if text_el is None:
+            continue
+        text = _text(text_el)
+        star_el = el.select_one(amazon.STAR_SELECTOR)
+        stars = amazon._parse_stars(_text(star_el)) if star_el is not None else 5
+        if len(text) > 0:
+            reviews.append({"text": text, "stars": stars})
+
+    has_next = soup.select_one(amazon.NEXT_PAGE_SELECTOR) is not None
+    return {"rating": rating, "reviews": reviews, "has_next": has_next}
+
+
+def parse_flipkart_reviews(html):
+    soup = _soup(html)
+
+    def rating_at(sel):
+        el = soup.select_one(sel)
+        return flipkart.parse_rating_text(_text(el)) if el is not None else None
+
+    rating = _first_match("flipkart", "rating", _css_only(flipkart.RATING_SELECTORS), rating_at)
+    if not rating:
+        rating = flipkart.rating_from_content(html)
+
+    def containers_at(sel):
+        return [t for t in (_text(el) for el in soup.select(sel)) if len(t) > flipkart.MIN_CONTAINER_TEXT]
+
+    containers = _first_match("flipkart", "containers", flipkart.REVIEW_CONTAINER_SELECTORS, containers_at,
+                              flipkart.BROAD_CONTAINER_SELECTORS) or []
+
+    reviews = []
+    for full_text in containers[:MAX_REVIEWS]:
+        text, stars = flipkart.clean_review_text(full_text)
+        if text and len(text) > flipkart.MIN_REVIEW_TEXT:
+            reviews.append({"text": text, "stars": stars})
+
+    return {"rating": rating, "reviews": reviews, "has_next": False}
+
+
+def parse_myntra_reviews(html):
+    soup = _soup(html)
+
+    def rating_at(sel):
+        el = soup.select_one(sel)
+        return myntra.parse_rating_text(_text(el)) if el is not None else None
+
+    rating = _first_match("myntra", "rating", myntra.MYNTRA_RATING_SELECTORS, rating_at, myntra.MYNTRA_BROAD_SELECTORS)
+
+    reviews = []
+    elements = _first_match("myntra", "reviews", myntra.MYNTRA_REVIEW_SELECTORS, soup.select,
+                            myntra.MYNTRA_BROAD_SELECTORS) or []
+    for el in elements[:MAX_REVIEWS]:
+        text, stars = myntra.clean_review_text(_text(el))
+        if len(text) > 20:
+            reviews.append({"text": text, "stars": stars})
+
+    return {"rating": rating, "reviews": reviews, "has_next": False}
+
+
+def parse_snapdeal_reviews(html):
+    soup = _soup(html)
+
+    def rating_at(sel):
+        el = soup.select_one(sel)
+        return myntra.parse_rating_text(_text(el)) if el is not None else None
+
+    rating = _first_match("snapdeal", "rating", myntra.SNAPDEAL_RATING_SELECTORS, rating_at,
+                          myntra.SNAPDEAL_BROAD_SELECTORS)
+
+    reviews = []
+    elements = _first_match("snapdeal", "reviews", myntra.SNAPDEAL_REVIEW_SELECTORS, soup.select) or []
+    for el in elements[:MAX_REVIEWS]:
+        text, stars = myntra.clean_review_text(_text(el))
+        if len(text) > 20:
+            reviews.append({"text": text, "stars": stars})
+
+    return {"rating": rating, "reviews": reviews, "has_next": False}
+
+
+PARSERS = {
+    "amazon": parse_amazon_reviews,
+    "flipkart": parse_flipkart_reviews,
+    "myntra": parse_myntra_reviews,
+    "snapdeal": parse_snapdeal_reviews,
+}
+
+
+def parse_reviews(platform, html):
+    return PARSERS[platform](html)
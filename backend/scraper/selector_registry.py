@@ -0,0 +1,177 @@
+# backend/scraper/selector_registry.py
+# Adaptive selector order per platform: the selector that matched last time is tried
+# first, the rest by hit rate. Parsing only touches in-process counts; sync() swaps them
+# with Redis in one pipeline per scrape run, so every worker learns from every scrape
+# without a network round trip per parse (or inside the async engine's event loop).
+from collections import defaultdict
+from contextlib import contextmanager
+import threading
+import os
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
+SELECTOR_STATS_KEY = "reputrack:selectors"
+SELECTOR_FIRST_TIMEOUT_MS = int(os.getenv("SELECTOR_FIRST_TIMEOUT_MS", "2000"))
+SELECTOR_RACE_TIMEOUT_MS = int(os.getenv("SELECTOR_RACE_TIMEOUT_MS", "6000"))
+
+
+def _new_entry():
+    return {"hits": defaultdict(int), "misses": defaultdict(int), "last": None}
+
+
+class SelectorRegistry:
+    """
+    Hit/miss stats per (platform, kind) selector list, e.g. ("flipkart", "containers").
+    A hit is the selector that produced the result, misses are the ones tried before it.
+    """
+
+    def __init__(self, redis_url=None):
+        self._stats = defaultdict(_new_entry)  # shared counts from the last sync + ours since
+        self._pending = defaultdict(_new_entry)  # ours since the last sync, not yet in Redis
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._redis = None
+
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=2, decode_responses=True)
+            except Exception as e:
+                print(f"[SELECTORS] Redis unavailable, keeping selector stats in-process: {e}")
+
+    def ordered(self, platform, kind, candidates, fallbacks=()):
+        """
+        candidates reordered: last winner first, then by hit rate, ties in the given order.
+        fallbacks are broad selectors that match almost any page; they stay last, in the
+        given order, so one lucky hit can't pin them ahead of the specific ones.
+        """
+        adaptive = [s for s in candidates if s not in fallbacks]
+        with self._lock:
+            entry = self._stats[(platform, kind)]
+            last = entry["last"]
+
+            def score(selector):
+                hits, misses = entry["hits"].get(selector, 0), entry["misses"].get(selector, 0)
+                return (hits + 1) / (hits + misses + 2)  # Laplace smoothing so unseen selectors start at 0.5
+
+            rest = sorted((s for s in adaptive if s != last), key=score, reverse=True)
+        head = [last] if last in adaptive else []
+        return head + rest + [s for s in candidates if s in fallbacks]
+
+    def record(self, platform, kind, winner, tried):
+        """winner: the selector that matched (None if none did); tried: selectors checked before it"""
+        misses = [s for s in tried if s != winner]
+        with self._lock:
+            for entry in (self._stats[(platform, kind)], self._pending[(platform, kind)]):
+                for selector in misses:
+                    entry["misses"][selector] += 1
+                if winner is not None:
+                    entry["hits"][winner] += 1
+                    entry["last"] = winner
+
+    def sync(self):
+        """
+        Push the counts recorded since the last sync and pull everyone's, in one Redis
+        pipeline. Blocking: call it between scrape runs, not from inside an event loop.
+        """
+        if self._redis is None:
+            return
+        with self._sync_lock:
+            with self._lock:
+                pending, self._pending = self._pending, defaultdict(_new_entry)
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for (platform, kind), entry in pending.items():
+                    prefix = f"{platform}:{kind}"
+                    for counter in ("hits", "misses"):
+                        for selector, count in entry[counter].items():
+                            pipe.hincrby(SELECTOR_STATS_KEY, f"{prefix}:{counter}:{selector}", count)
+                    if entry["last"] is not None:
+                        pipe.hset(SELECTOR_STATS_KEY, f"{prefix}:last", entry["last"])
+                pipe.hgetall(SELECTOR_STATS_KEY)
+                raw = pipe.execute()[-1]
+            except Exception as e:
+                print(f"[SELECTORS] Redis sync failed: {e}")
+                with self._lock:
+                    self._merge(self._pending, pending)  # retried on the next sync
+                return
+
+            shared = defaultdict(_new_entry)
+            for field, value in raw.items():
+                platform, kind, counter, *selector = field.split(":", 3)
+                if counter == "last":
+                    shared[(platform, kind)]["last"] = value
+                elif counter in ("hits", "misses") and selector:
+                    shared[(platform, kind)][counter][selector[0]] = int(value)
+            with self._lock:
+                # Counts recorded while the pipeline ran aren't in Redis yet; keep them on top
+                self._merge(shared, self._pending)
+                self._stats = shared
+
+    @staticmethod
+    def _merge(into, counts):
+        for key, entry in counts.items():
+            for counter in ("hits", "misses"):
+                for selector, count in entry[counter].items():
+                    into[key][counter][selector] += count
+            if entry["last"] is not None:
+                into[key]["last"] = entry["last"]
+
+    def stats(self):
+        with self._lock:
+            return {
+                f"{platform}:{kind}": {
+                    "last": entry["last"],
+                    "hits": dict(entry["hits"]),
+                    "misses": dict(entry["misses"]),
+                }
+                for (platform, kind), entry in self._stats.items()
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_selector_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SelectorRegistry(redis_url=os.getenv("REDIS_URL"))
+        return _registry
+
+
+@contextmanager
+def synced_selector_stats():
+    """Around a scrape run: the shared order in before it, the run's counts out after it"""
+    registry = get_selector_registry()
+    registry.sync()
+    try:
+        yield registry
+    finally:
+        registry.sync()
+
+
+def _race_plan(platform, kind, candidates, fallbacks):
+    ordered = get_selector_registry().ordered(platform, kind, candidates, fallbacks)
+    return ordered[0], ", ".join(ordered)
+
+
+def wait_for_any(page, platform, kind, candidates, fallbacks=(),
+                 first_timeout=SELECTOR_FIRST_TIMEOUT_MS, race_timeout=SELECTOR_RACE_TIMEOUT_MS):
+    """
+    Wait until one of the candidate selectors is on the page: the favourite gets a short
+    head start, then all of them race in a single browser-side wait. Returns True if any appeared.
+    """
+    favourite, union = _race_plan(platform, kind, candidates, fallbacks)
+    try:
+        page.wait_for_selector(favourite, timeout=first_timeout)
+        return True
+    except PlaywrightTimeout:
+        pass
+    try:
+        page.wait_for_selector(union, timeout=race_timeout)
+        return True
+    except PlaywrightTimeout:
+        return False
+
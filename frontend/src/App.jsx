@@ -6,6 +6,94 @@ import axios from "axios";
 
 axios.defaults.baseURL = import.meta.env.VITE_API_URL || "http://localhost:8000";
 
+const REVIEW_FILTERS = [
+  { label: "All", params: {} },
+  { label: "Fake", params: { is_fake: true } },
+  { label: "Genuine", params: { is_fake: false } },
+  { label: "Positive", params: { sentiment: "positive" } },
+  { label: "Negative", params: { sentiment: "negative" } },
+];
+
+// Reviews are fetched lazily, a page at a time, only when a product's detail modal is open
+function LinkReviews({ productId, linkId }) {
+  const [reviews, setReviews] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [filter, setFilter] = useState(REVIEW_FILTERS[0]);
+  const [loadingReviews, setLoadingReviews] = useState(false);
+
+  const fetchReviews = async (cursor = null) => {
+    setLoadingReviews(true);
+    try {
+      const token = await window.Clerk.session.getToken({ template: "fastapi" });
+      const res = await axios.get(`/api/products/${productId}/links/${linkId}/reviews`, {
+        headers: { Authorization: `Bearer ${token}` },
+        params: { ...filter.params, limit: 10, ...(cursor ? { cursor } : {}) },
+      });
+      setReviews(prev => (cursor ? [...prev, ...res.data.items] : res.data.items));
+      setNextCursor(res.data.next_cursor);
+    } catch (e) {
+      console.error(e);
+    } finally {
+      setLoadingReviews(false);
+    }
+  };
+
+  useEffect(() => {
+    fetchReviews();
+  }, [productId, linkId, filter]);
+
+  return (
+    <div className="pt-6 border-t border-gray-200">
+      <div className="flex flex-wrap items-center justify-between gap-2 mb-4">
+        <h3 className="text-sm font-semibold text-gray-900">Reviews</h3>
+        <div className="flex flex-wrap gap-1">
+          {REVIEW_FILTERS.map((f) => (
+            <button
+              key={f.label}
+              onClick={() => setFilter(f)}
+              className={`px-3 py-1 text-xs font-medium rounded-lg transition ${
+                filter.label === f.label ? "bg-gray-900 text-white" : "bg-gray-100 text-gray-700 hover:bg-gray-200"
+              }`}
+            >
+              {f.label}
+            </button>
+          ))}
+        </div>
+      </div>
+
+      <div className="space-y-3">
+        {reviews.map((review) => (
+          <div key={review.id} className="p-4 rounded-lg bg-gray-50 border border-gray-200">
+            <div className="flex items-center gap-2 mb-2 text-xs">
+              {review.stars && <span className="font-medium text-gray-900">{"⭐".repeat(review.stars)}</span>}
+              {review.is_fake !== null && (
+                <span className={`px-2 py-0.5 rounded ${review.is_fake ? "bg-red-50 text-red-600" : "bg-green-50 text-green-600"}`}>
+                  {review.is_fake ? "Likely fake" : "Genuine"}
+                </span>
+              )}
+              {review.sentiment && <span className="text-gray-500">{review.sentiment.toLowerCase()}</span>}
+            </div>
+            <p className="text-sm text-gray-700">{review.text}</p>
+          </div>
+        ))}
+        {!loadingReviews && reviews.length === 0 && (
+          <p className="text-sm text-gray-500 text-center py-4">No reviews match this filter</p>
+        )}
+      </div>
+
+      {nextCursor && (
+        <button
+          onClick={() => fetchReviews(nextCursor)}
+          disabled={loadingReviews}
+          className="w-full mt-4 px-4 py-2 bg-gray-100 text-gray-900 rounded-lg hover:bg-gray-200 transition disabled:opacity-50 text-sm font-medium"
+        >
+          {loadingReviews ? "Loading..." : "Load more"}
+        </button>
+      )}
+    </div>
+  );
+}
+
 function Dashboard() {
   const { user } = useUser();
   const [products, setProducts] = useState([]);
@@ -458,6 +546,8 @@ function Dashboard() {
                           </div>
                         </div>
 
+                        <LinkReviews productId={selectedProduct.id} linkId={link.id} />
+
                         {link.last_scraped && (
                           <p className="text-xs text-gray-500 text-center pt-4 border-t border-gray-200">
                             Last analyzed on {new Date(link.last_scraped).toLocaleDateString('en-US', { 